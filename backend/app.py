@@ -1,11 +1,58 @@
-from flask import Flask, request, jsonify
+import time
+
+from flask import Flask, request, jsonify, g, got_request_exception
 from flask_cors import CORS
 
 from routes.simple_mix import simple_bp
 from routes.complex_mix import complex_bp
+from routes.bulk_mix import bulk_bp
+from routes.optimize_mix import optimize_bp
+from routes.multi_mix import multi_bp
+from routes.catalog import catalog_bp
+from routes.admin import admin_bp
+from routes.jobs import jobs_bp
+from routes.live import live_bp
+from routes.metrics import TimedJSONProvider, metrics_bp
+from services.metrics import begin_request, end_request, profiler, record_request, stage
 
 app = Flask(__name__)
-CORS(app)
+app.json = TimedJSONProvider(app)
+# Preglednik pamti odgovor na preflight 10 minuta, pa česti PATCH/POST zahtjevi ne šalju OPTIONS svaki put
+CORS(app, max_age=600)
+
+# Metrike i profiliranje zahtjeva
+def _route():
+    return request.url_rule.rule if request.url_rule else "unmatched"
+
+@app.before_request
+def start_metrics():
+    g.metrics_start = time.perf_counter()
+    begin_request(_route())
+    g.profile = profiler.start()
+    # JSON tijelo se parsira ovdje kako bi se izmjerilo; rute koriste spremljeni rezultat
+    if request.is_json and request.content_length:
+        with stage("parse"):
+            if request.get_json(silent=True) is None:
+                g.error_type = "invalid_json"
+
+def _record_exception(sender, exception, **extra):
+    g.error_type = type(exception).__name__
+
+got_request_exception.connect(_record_exception, app)
+
+@app.after_request
+def record_metrics(response):
+    record_request(
+        _route(), request.method, response.status_code,
+        time.perf_counter() - g.metrics_start, g.get("error_type")
+    )
+    return response
+
+@app.teardown_request
+def finish_metrics(exc):
+    end_request()
+    if g.get("profile") is not None:
+        profiler.finish(g.profile, _route())
 
 # Test routes
 @app.route('/')
@@ -19,6 +66,14 @@ def test():
 # registracija blueprintova
 app.register_blueprint(simple_bp, url_prefix="/api/mix")
 app.register_blueprint(complex_bp, url_prefix="/api/mix")
+app.register_blueprint(bulk_bp, url_prefix="/api/mix")
+app.register_blueprint(optimize_bp, url_prefix="/api/mix")
+app.register_blueprint(multi_bp, url_prefix="/api/mix")
+app.register_blueprint(catalog_bp, url_prefix="/api/catalog")
+app.register_blueprint(admin_bp, url_prefix="/api/admin")
+app.register_blueprint(jobs_bp, url_prefix="/api/jobs")
+app.register_blueprint(live_bp, url_prefix="/api/live")
+app.register_blueprint(metrics_bp)
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,82 @@
+"""Spremanje rezultata benchmarka kao JSON baseline i usporedba s pragom regresije"""
+import json
+import os
+import platform
+import sys
+import time
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+# Zadani dopušteni relativni pad performansi prije nego što se run proglasi neuspješnim
+DEFAULT_THRESHOLD = 0.25
+
+def higher_is_better(metric):
+    """Propusnost raste s performansama; sve ostale metrike su vremena"""
+    return metric.endswith("_rps")
+
+def environment():
+    import numpy
+    return {
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+def save(path, results, settings):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as output:
+        json.dump({"environment": environment(), "settings": settings, "results": results}, output, indent=2)
+        output.write("\n")
+
+def compare(results, baseline, threshold, gated):
+    """Usporedba po slučaju za metrike iz `gated`; vraća (retke, broj regresija)"""
+    rows = []
+    regressions = 0
+    for case, metrics in results.items():
+        for metric in gated:
+            value = metrics.get(metric)
+            previous = baseline.get(case, {}).get(metric)
+            if value is None or not previous:
+                continue
+            change = value / previous - 1
+            slower = -change if higher_is_better(metric) else change
+            regressed = slower > threshold
+            regressions += regressed
+            rows.append((case, metric, previous, value, change, regressed))
+    return rows, regressions
+
+def add_arguments(parser, name):
+    parser.add_argument("--save", nargs="?", const=os.path.join(BASELINE_DIR, f"{name}.json"),
+                        help=f"spremi rezultate kao baseline (zadano baselines/{name}.json)")
+    parser.add_argument("--compare", nargs="?", const=os.path.join(BASELINE_DIR, f"{name}.json"),
+                        help="usporedi s baselineom i završi s kodom 1 pri regresiji")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"dopušteni relativni pad (zadano {DEFAULT_THRESHOLD})")
+
+def finish(args, results, settings, gated):
+    """Sprema i/ili uspoređuje rezultate prema argumentima naredbenog retka
+
+    Regresija se provjerava samo za metrike iz `gated`; ostale se spremaju
+    informativno jer su previše šumovite za automatski prag.
+    """
+    if args.save:
+        save(args.save, results, settings)
+        print(f"Baseline spremljen u {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get("settings") != settings:
+            print(f"Upozorenje: postavke se razlikuju od baselinea ({baseline.get('settings')})")
+        rows, regressions = compare(results, baseline["results"], args.threshold, gated)
+        print(f"\n{'slučaj':<32} {'metrika':<14} {'baseline':>12} {'sada':>12} {'promjena':>9}")
+        for case, metric, previous, value, change, regressed in rows:
+            flag = "  REGRESIJA" if regressed else ""
+            print(f"{case:<32} {metric:<14} {previous:>12.3f} {value:>12.3f} {change:>+8.1%}{flag}")
+        if regressions:
+            print(f"\n{regressions} regresija iznad praga {args.threshold:.0%}")
+            sys.exit(1)
+        print(f"\nBez regresija iznad praga {args.threshold:.0%}")
@@ -0,0 +1,192 @@
+"""Test opterećenja /api/mix/simple i /api/mix/complex pod gunicornom
+
+Pokretanje iz direktorija backend:
+    python -m benchmarks.load                        # pokreće gunicorn na slobodnom portu
+    python -m benchmarks.load --url http://host:5000 # koristi već pokrenut server
+    python -m benchmarks.load --save / --compare     # baseline u baselines/load.json
+
+Svaki scenarij šalje zahtjeve iz `--concurrency` dretvi tijekom `--duration`
+sekundi nakon kratkog zagrijavanja. Ulazi se ciklički biraju iz fiksnog
+skupa, pa se dio složenih zahtjeva poslužuje iz cachea kao u stvarnom radu.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+
+from benchmarks import baseline
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Broj različitih tijela zahtjeva po scenariju
+DISTINCT_BODIES = 500
+
+def _simple_bodies(rng):
+    bodies = []
+    for _ in range(DISTINCT_BODIES):
+        a1 = round(rng.uniform(0, 50), 2)
+        a2 = round(rng.uniform(60, 100), 2)
+        bodies.append({"a1": a1, "a2": a2, "m": round(rng.uniform(a1 + 1, a2 - 1), 2), "S": round(rng.uniform(10, 1000), 2)})
+    return bodies
+
+def _complex_bodies(rng, worse, better):
+    bodies = []
+    for _ in range(DISTINCT_BODIES):
+        desired = round(rng.uniform(40, 60), 1)
+        intensities = (
+            [round(rng.uniform(1, desired - 1), 1) for _ in range(worse)]
+            + [round(rng.uniform(desired + 1, 99), 1) for _ in range(better)]
+        )
+        bodies.append({
+            "components": [{"name": f"K{i + 1}", "intensity": intensity} for i, intensity in enumerate(intensities)],
+            "total_amount": 100,
+            "desired_intensity": desired,
+        })
+    return bodies
+
+def scenarios():
+    rng = random.Random(2024)
+    return {
+        "simple": ("/api/mix/simple", _simple_bodies(rng)),
+        "complex_3": ("/api/mix/complex", _complex_bodies(rng, 2, 1)),
+        "complex_4_2+2": ("/api/mix/complex", _complex_bodies(rng, 2, 2)),
+        "complex_4_3+1": ("/api/mix/complex", _complex_bodies(rng, 3, 1)),
+    }
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_gunicorn(workers, threads):
+    """Pokreće gunicorn iz direktorija backend i čeka da odgovori"""
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-w", str(workers), "--threads", str(threads),
+         "-b", f"127.0.0.1:{port}", "--log-level", "warning", "app:app"],
+        cwd=BACKEND_DIR,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/test")
+            if connection.getresponse().status == 200:
+                return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("gunicorn se nije pokrenuo u 30 s")
+
+def _worker(host, port, path, bodies, offset, stop_at, latencies, errors):
+    connection = None
+    index = offset
+    while time.perf_counter() < stop_at:
+        body = bodies[index % len(bodies)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            if connection is None:
+                connection = http.client.HTTPConnection(host, port, timeout=30)
+            connection.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+            # Sync workeri gunicorna zatvaraju vezu nakon svakog odgovora
+            if response.getheader("Connection", "").lower() == "close":
+                connection.close()
+                connection = None
+        except OSError as e:
+            errors.append(type(e).__name__)
+            connection = None
+            continue
+        latencies.append(time.perf_counter() - started)
+
+def run_scenario(url, path, bodies, concurrency, duration, warmup):
+    parsed = urllib.parse.urlparse(url)
+    encoded = [json.dumps(body).encode("utf-8") for body in bodies]
+
+    def drive(seconds):
+        latencies, errors = [], []
+        stop_at = time.perf_counter() + seconds
+        threads = [
+            threading.Thread(target=_worker, args=(
+                parsed.hostname, parsed.port, path, encoded, i * len(encoded) // concurrency,
+                stop_at, latencies, errors
+            ))
+            for i in range(concurrency)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return latencies, errors, time.perf_counter() - started
+
+    drive(warmup)
+    latencies, errors, elapsed = drive(duration)
+    latencies.sort()
+
+    def percentile(q):
+        if not latencies:
+            return float("nan")
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="adresa pokrenutog servera; bez nje se pokreće gunicorn")
+    parser.add_argument("--workers", type=int, default=2, help="broj gunicorn workera (zadano 2)")
+    parser.add_argument("--threads", type=int, default=1, help="broj dretvi po workeru (zadano 1)")
+    parser.add_argument("--concurrency", type=int, default=8, help="broj istodobnih klijenata (zadano 8)")
+    parser.add_argument("--duration", type=float, default=10, help="trajanje scenarija u sekundama (zadano 10)")
+    parser.add_argument("--warmup", type=float, default=2, help="zagrijavanje u sekundama (zadano 2)")
+    parser.add_argument("--scenario", action="append", help="pokreni samo navedene scenarije")
+    baseline.add_arguments(parser, "load")
+    args = parser.parse_args()
+
+    process = None
+    url = args.url
+    if url is None:
+        process, url = start_gunicorn(args.workers, args.threads)
+    try:
+        results = {}
+        print(f"{'scenarij':<16} {'zahtjeva':>9} {'greške':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for name, (path, bodies) in scenarios().items():
+            if args.scenario and name not in args.scenario:
+                continue
+            result = run_scenario(url, path, bodies, args.concurrency, args.duration, args.warmup)
+            results[name] = result
+            print(f"{name:<16} {result['requests']:>9} {result['errors']:>7} {result['throughput_rps']:>9.1f} "
+                  f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f}")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    settings = {
+        "workers": None if args.url else args.workers,
+        "threads": None if args.url else args.threads,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+    }
+    baseline.finish(args, results, settings, gated=("throughput_rps", "p95_ms"))
+
+if __name__ == "__main__":
+    main()
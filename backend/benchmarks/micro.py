@@ -0,0 +1,127 @@
+"""Mikro-benchmarkovi izračuna smjesa na reprezentativnim i nepovoljnim ulazima
+
+Pokretanje iz direktorija backend:
+    python -m benchmarks.micro
+    python -m benchmarks.micro --save               # zapiši baselines/micro.json
+    python -m benchmarks.micro --compare            # usporedi, kod 1 pri regresiji
+
+Ulazi se generiraju iz fiksnog seeda pa su rezultati usporedivi između
+pokretanja. Složene smjese mjere se bez cachea ("cold") i s punim cacheom
+("warm"), jer cache inače skriva trošak rješavanja.
+"""
+import argparse
+import random
+import statistics
+import timeit
+
+from benchmarks import baseline
+from routes.complex_mix import generate_mix_3_components, generate_mix_4_components, solution_cache
+from routes.simple_mix import calculate_simple_mix
+from services.ratio import format_simplified_ratio
+
+# Broj različitih ulaza po slučaju
+INPUTS = 200
+
+def _value(rng, low, high, precise):
+    """Vrijednost s 2 decimale ili punom preciznošću pomičnog zareza"""
+    value = rng.uniform(low, high)
+    return value if precise else round(value, 2)
+
+def simple_inputs(rng, precise):
+    inputs = []
+    for _ in range(INPUTS):
+        a1 = _value(rng, 0, 50, precise)
+        a2 = _value(rng, 60, 100, precise)
+        if precise:
+            # m vrlo blizu a1 i velika količina daju velike cijele brojeve u omjeru
+            m = a1 + (a2 - a1) * rng.uniform(1e-7, 1e-3)
+            S = rng.uniform(1e9, 1e12)
+        else:
+            m = _value(rng, a1 + 1, a2 - 1, False)
+            S = _value(rng, 10, 1000, False)
+        inputs.append({"a1": a1, "a2": a2, "m": m, "S": S})
+    return inputs
+
+def complex_inputs(rng, worse, better, precise):
+    """Komponente s `worse` lošijih i `better` boljih intenziteta od cilja"""
+    inputs = []
+    for _ in range(INPUTS):
+        desired = _value(rng, 40, 60, precise)
+        intensities = (
+            [_value(rng, 1, desired - 1, precise) for _ in range(worse)]
+            + [_value(rng, desired + 1, 99, precise) for _ in range(better)]
+        )
+        rng.shuffle(intensities)
+        inputs.append(([{"intensity": intensity} for intensity in intensities], 100.0, desired))
+    return inputs
+
+def ratio_inputs(rng, precise):
+    if precise:
+        # Različiti redovi veličine i 10 decimala
+        return [[round(rng.uniform(1e-6, 1) * 10 ** rng.randint(0, 6), 10) for _ in range(4)] for _ in range(INPUTS)]
+    return [[round(rng.uniform(1, 100), 2) for _ in range(4)] for _ in range(INPUTS)]
+
+def cases():
+    """Slučajevi kao (naziv, funkcija jednog poziva, ulazi, koristi li cache)"""
+    rng = random.Random(2024)
+    generated = []
+    for label, precise in (("representative", False), ("adversarial", True)):
+        generated.append((f"simple_mix/{label}", calculate_simple_mix, simple_inputs(rng, precise), False))
+        generated.append((
+            f"complex_3/{label}",
+            lambda args: generate_mix_3_components(*args),
+            complex_inputs(rng, 2, 1, precise), True
+        ))
+        for worse, better in ((2, 2), (3, 1), (1, 3)):
+            generated.append((
+                f"complex_4_{worse}+{better}/{label}",
+                lambda args: generate_mix_4_components(*args),
+                complex_inputs(rng, worse, better, precise), True
+            ))
+        generated.append((f"format_simplified_ratio/{label}", format_simplified_ratio, ratio_inputs(rng, precise), False))
+    return generated
+
+# Najkraće trajanje jednog mjerenja; kraća mjerenja su previše šumovita
+MIN_MEASUREMENT_SECONDS = 0.2
+
+def time_per_call(function, inputs, repeat):
+    """Najbolje i srednje vrijeme po pozivu u mikrosekundama"""
+    timer = timeit.Timer(lambda: [function(item) for item in inputs])
+    number, elapsed = timer.autorange()
+    number = max(number, int(number * MIN_MEASUREMENT_SECONDS / elapsed))
+    timings = timer.repeat(number=number, repeat=repeat)
+    calls = number * len(inputs)
+    return {"best_us": min(timings) / calls * 1e6, "median_us": statistics.median(timings) / calls * 1e6}
+
+def run(repeat=5):
+    results = {}
+    maxsize = solution_cache.maxsize
+    try:
+        for name, function, inputs, cached in cases():
+            if cached:
+                solution_cache.maxsize = 0
+                results[f"{name}/cold"] = time_per_call(function, inputs, repeat)
+                solution_cache.maxsize = max(maxsize, len(inputs))
+                solution_cache.clear()
+                results[f"{name}/warm"] = time_per_call(function, inputs, repeat)
+            else:
+                results[name] = time_per_call(function, inputs, repeat)
+    finally:
+        solution_cache.maxsize = maxsize
+        solution_cache.clear()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="broj ponavljanja mjerenja (zadano 5)")
+    baseline.add_arguments(parser, "micro")
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    print(f"{'slučaj':<48} {'najbolje µs':>12} {'medijan µs':>12}")
+    for name, timing in results.items():
+        print(f"{name:<48} {timing['best_us']:>12.2f} {timing['median_us']:>12.2f}")
+    baseline.finish(args, results, {"repeat": args.repeat, "inputs": INPUTS}, gated=("best_us",))
+
+if __name__ == "__main__":
+    main()
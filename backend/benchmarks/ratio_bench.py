@@ -0,0 +1,51 @@
+"""Mikro-benchmark skraćivanja omjera s obzirom na preciznost ulaza
+
+Pokretanje iz direktorija backend:
+    python -m benchmarks.ratio_bench
+"""
+import random
+import timeit
+
+from services.ratio import format_simplified_ratio
+
+def legacy_format_simplified_ratio(ratios):
+    """Prijašnja implementacija (množenje s 10^n u pomičnom zarezu i rekurzivni gcd)"""
+    def gcd(a, b):
+        return int(b == 0 and a or gcd(b, a % b))
+
+    max_decimals = 0
+    for ratio in ratios:
+        str_ratio = f"{ratio:.10f}".rstrip('0')
+        if '.' in str_ratio:
+            max_decimals = max(max_decimals, len(str_ratio.split('.')[1]))
+    multiplier = 10 ** max_decimals
+    int_ratios = [max(1, abs(round(ratio * multiplier))) for ratio in ratios]
+    divisor = int_ratios[0]
+    for number in int_ratios[1:]:
+        divisor = gcd(divisor, number)
+    return " : ".join(str(r // divisor) for r in int_ratios)
+
+def make_inputs(decimals, components=4, count=200, seed=0):
+    rng = random.Random(seed)
+    return [[round(rng.uniform(1, 1000), decimals) for _ in range(components)] for _ in range(count)]
+
+def time_per_call(function, inputs, repeat=5):
+    number = max(1, 2000 // len(inputs))
+    best = min(timeit.repeat(lambda: [function(ratios) for ratios in inputs], number=number, repeat=repeat))
+    return best / (number * len(inputs))
+
+def run():
+    functions = {
+        "legacy": legacy_format_simplified_ratio,
+        "decimal": format_simplified_ratio,
+    }
+    results = {}
+    for decimals in (0, 2, 4, 6, 8, 10):
+        inputs = make_inputs(decimals)
+        results[decimals] = {name: time_per_call(function, inputs) * 1e6 for name, function in functions.items()}
+    return results
+
+if __name__ == "__main__":
+    print(f"{'decimale':>8} " + " ".join(f"{name:>10}" for name in ("legacy", "decimal")) + "   (µs po pozivu)")
+    for decimals, timings in run().items():
+        print(f"{decimals:>8} " + " ".join(f"{timings[name]:>10.2f}" for name in ("legacy", "decimal")))
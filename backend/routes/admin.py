@@ -0,0 +1,60 @@
+import hmac
+import os
+
+from flask import Blueprint, request, jsonify
+
+from services.cache import CACHES
+from services.metrics import MAX_SAMPLE_RATE, profiler
+
+admin_bp = Blueprint('admin', __name__)
+
+# Adrese s kojih su administratorske rute dostupne kad MIX_ADMIN_TOKEN nije zadan
+LOOPBACK_ADDRESSES = ("127.0.0.1", "::1")
+
+# Zaglavlja proxyja; zahtjev proslijeđen preko lokalnog proxyja nije lokalni
+PROXY_HEADERS = ("X-Forwarded-For", "X-Real-IP", "Forwarded")
+
+@admin_bp.before_request
+def require_admin():
+    """Uz MIX_ADMIN_TOKEN traži zaglavlje `Authorization: Bearer <token>`, inače samo lokalne zahtjeve"""
+    token = os.environ.get("MIX_ADMIN_TOKEN")
+    if token:
+        supplied = request.headers.get("Authorization", "")
+        if hmac.compare_digest(supplied.encode("utf-8"), f"Bearer {token}".encode("utf-8")):
+            return None
+        return jsonify({"error": "Potreban je administratorski token"}), 401
+    if request.remote_addr in LOOPBACK_ADDRESSES and not any(header in request.headers for header in PROXY_HEADERS):
+        return None
+    return jsonify({"error": "Administratorske rute dostupne su samo lokalno ili uz MIX_ADMIN_TOKEN"}), 403
+
+@admin_bp.route("/cache", methods=["GET"])
+def cache_stats():
+    return jsonify({name: cache.stats() for name, cache in CACHES.items()})
+
+@admin_bp.route("/cache", methods=["DELETE"])
+def cache_clear():
+    for cache in CACHES.values():
+        cache.clear()
+    return jsonify({name: cache.stats() for name, cache in CACHES.items()})
+
+@admin_bp.route("/profile", methods=["GET"])
+def profile_settings():
+    return jsonify({
+        "sample_rate": profiler.sample_rate,
+        "max_sample_rate": MAX_SAMPLE_RATE,
+        "directory": profiler.directory,
+        "max_files": profiler.max_files,
+        "written": profiler.written
+    })
+
+@admin_bp.route("/profile", methods=["PUT"])
+def profile_update():
+    data = request.get_json(silent=True)
+    try:
+        sample_rate = float(data["sample_rate"])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "Potreban je numerički parametar sample_rate"}), 400
+    if not 0 <= sample_rate <= MAX_SAMPLE_RATE:
+        return jsonify({"error": f"sample_rate mora biti između 0 i {MAX_SAMPLE_RATE}"}), 400
+    profiler.sample_rate = sample_rate
+    return profile_settings()
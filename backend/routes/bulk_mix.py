@@ -0,0 +1,184 @@
+import csv
+import io
+import json
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+
+from routes.complex_mix import calculate_complex_mix
+from routes.simple_mix import calculate_simple_mix
+
+bulk_bp = Blueprint('bulk_mix', __name__)
+
+# Broj redaka koji se šalje klijentu u jednom komadu
+CHUNK_ROWS = 256
+
+CSV_TYPES = ("text/csv", "application/csv")
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+CALCULATIONS = {
+    "simple": calculate_simple_mix,
+    "complex": calculate_complex_mix,
+}
+
+# Stupci koji se dodaju ulaznom CSV-u
+RESULT_COLUMNS = ["quantities", "simplified_ratio", "combinations", "error"]
+
+# Najdulji redak ulaza u bajtovima; za dulji redak vraća se greška tog retka
+MAX_LINE_BYTES = 64 * 1024
+
+LINE_TOO_LONG = f"Redak je dulji od {MAX_LINE_BYTES} bajtova"
+
+def _read_lines(stream):
+    """Čita tijelo zahtjeva redak po redak, bez učitavanja cijele datoteke
+
+    Umjesto predugog retka dolazi None; redak se ne drži u memoriji nego se
+    ostatak čita u dijelovima i odbacuje.
+    """
+    while True:
+        line = stream.readline(MAX_LINE_BYTES + 1)
+        if not line:
+            return
+        if len(line) > MAX_LINE_BYTES and not line.endswith(b"\n"):
+            while line and not line.endswith(b"\n"):
+                line = stream.readline(MAX_LINE_BYTES)
+            yield None
+            continue
+        yield line.decode("utf-8", errors="replace")
+
+def _split(value):
+    return [item.strip() for item in value.split(";") if item.strip()]
+
+def _simple_from_csv(row):
+    return {field: row.get(field) for field in ("a1", "a2", "m", "S")}
+
+def _complex_from_csv(row):
+    """Složeni recept iz CSV retka: stupac `intensities` (odvojeno s ;) ili `intensity_1` ... `intensity_n`"""
+    if row.get("intensities"):
+        intensities = _split(row["intensities"])
+    else:
+        columns = sorted(
+            (key for key in row if key and key.startswith("intensity_") and key[10:].isdigit()),
+            key=lambda key: int(key[10:])
+        )
+        intensities = [row[key] for key in columns if row[key] not in (None, "")]
+
+    names = _split(row.get("names") or "")
+    components = []
+    for i, intensity in enumerate(intensities):
+        components.append({
+            "name": names[i] if i < len(names) else f"Komponenta {i + 1}",
+            "intensity": intensity
+        })
+    return {
+        "components": components,
+        "total_amount": row.get("total_amount"),
+        "desired_intensity": row.get("desired_intensity"),
+    }
+
+CSV_PARSERS = {
+    "simple": _simple_from_csv,
+    "complex": _complex_from_csv,
+}
+
+def _csv_result(result):
+    """Pretvara rezultat JSON endpointa u stupce izlaznog CSV-a"""
+    if "error" in result:
+        return ["", "", "", result["error"]]
+    if "method_details" in result:
+        solutions = result["method_details"]["all_solutions"]
+        return [
+            "|".join(";".join(map(str, solution["quantities"])) for solution in solutions),
+            "|".join(solution["simplified_ratio"] for solution in solutions),
+            "|".join(solution["combination_used"] for solution in solutions),
+            "",
+        ]
+    return [";".join(map(str, result["quantities"])), result["simplified_ratio"], "", ""]
+
+def _stream_csv(lines, mode):
+    calculate = CALCULATIONS[mode]
+    parse = CSV_PARSERS[mode]
+    skipped = []
+
+    def csv_lines():
+        # Predugi redak postaje prazan redak; bilježi se da ga treba prijaviti kao grešku
+        for line in lines:
+            if line is None:
+                skipped.append(LINE_TOO_LONG)
+                line = "\n"
+            yield line
+
+    reader = csv.reader(csv_lines())
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+
+    fieldnames = next((row for row in reader if row), None)
+    if skipped:
+        writer.writerow(RESULT_COLUMNS)
+        writer.writerow(_csv_result({"error": f"Zaglavlje: {LINE_TOO_LONG}"}))
+        yield buffer.getvalue()
+        return
+    if fieldnames is None:
+        return
+    writer.writerow(fieldnames + RESULT_COLUMNS)
+
+    index = 0
+    for values in reader:
+        if values:
+            row = dict(zip(fieldnames, values))
+            writer.writerow([row.get(field) for field in fieldnames] + _csv_result(calculate(parse(row))))
+        elif skipped:
+            writer.writerow([""] * len(fieldnames) + _csv_result({"error": skipped.pop()}))
+        else:
+            # Prazni redci se preskaču
+            continue
+        index += 1
+        if index % CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+def _stream_ndjson(lines, mode):
+    calculate = CALCULATIONS[mode]
+    chunk = []
+
+    for index, line in enumerate(lines, start=1):
+        if line is None:
+            result = {"error": LINE_TOO_LONG}
+        elif not line.strip():
+            continue
+        else:
+            try:
+                data = json.loads(line)
+            except (ValueError, RecursionError):
+                # RecursionError: duboko ugniježđen redak unutar dopuštene duljine
+                result = {"error": "Neispravan JSON redak"}
+            else:
+                result = calculate(data) if isinstance(data, dict) else {"error": "Redak mora biti JSON objekt"}
+
+        chunk.append(json.dumps({"line": index, **result}, ensure_ascii=False))
+        if len(chunk) == CHUNK_ROWS:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+@bulk_bp.route("/bulk", methods=["POST"])
+def bulk_mix():
+    mode = request.args.get("mode", "simple")
+    if mode not in CALCULATIONS:
+        return jsonify({"error": "Način mora biti 'simple' ili 'complex'"}), 400
+
+    if request.mimetype in CSV_TYPES:
+        stream, mimetype = _stream_csv, "text/csv"
+    elif request.mimetype in NDJSON_TYPES:
+        stream, mimetype = _stream_ndjson, "application/x-ndjson"
+    else:
+        return jsonify({"error": "Podržani formati su text/csv i application/x-ndjson"}), 415
+
+    lines = _read_lines(request.stream)
+    response = Response(stream_with_context(stream(lines, mode)), mimetype=mimetype)
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,89 @@
+from flask import Blueprint, request, jsonify
+
+from services.catalog import get_catalog
+from services.schema import SchemaError, compile_schema, number, optional, string
+
+catalog_bp = Blueprint('catalog', __name__)
+
+# Najveći broj komponenti u jednom odgovoru raspona
+MAX_RANGE_RESULTS = 1000
+
+# ID-ovi se spremaju kao int64
+MAX_COMPONENT_ID = 2 ** 63 - 1
+
+def _component_id(value):
+    # Strogo cijeli broj: 1.7 ili "1" ne smiju tiho postati ID 1
+    if type(value) is not int or not 1 <= value <= MAX_COMPONENT_ID:
+        raise SchemaError("ID komponente mora biti pozitivan cijeli broj")
+    return value
+
+COMPONENT_SCHEMA = compile_schema({
+    "id": optional(_component_id),
+    "name": optional(string("Naziv komponente mora biti tekst")),
+    "intensity": number("Intenzitet komponente mora biti broj"),
+    "unit_cost": optional(number("Cijena komponente mora biti broj"), 0.0),
+    "stock": optional(number(
+        "Zaliha komponente mora biti broj", (lambda stock: stock >= 0, "Zaliha komponente ne smije biti negativna")
+    ), float("inf")),
+}, message="Komponenta mora biti JSON objekt")
+
+@catalog_bp.route("/components/<int:component_id>", methods=["GET"])
+def get_component(component_id):
+    component = get_catalog().get(component_id)
+    if component is None:
+        return jsonify({"error": f"Komponenta {component_id} ne postoji"}), 404
+    return jsonify(component)
+
+@catalog_bp.route("/components/<int:component_id>", methods=["DELETE"])
+def delete_component(component_id):
+    if not get_catalog().delete([component_id]):
+        return jsonify({"error": f"Komponenta {component_id} ne postoji"}), 404
+    return jsonify({"deleted": component_id})
+
+@catalog_bp.route("/components", methods=["POST"])
+def upsert_components():
+    data = request.get_json(silent=True)
+    components = data.get("components") if isinstance(data, dict) else data
+    if not isinstance(components, list) or not components:
+        return jsonify({"error": "Potrebna je lista komponenti"}), 400
+
+    try:
+        components = [COMPONENT_SCHEMA(component) for component in components]
+    except SchemaError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        ids = get_catalog().upsert(components)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"ids": ids, "size": len(get_catalog())})
+
+@catalog_bp.route("/components/nearest", methods=["GET"])
+def nearest_components():
+    try:
+        intensity = float(request.args["intensity"])
+        count = min(int(request.args.get("count", 1)), MAX_RANGE_RESULTS)
+    except (KeyError, ValueError):
+        return jsonify({"error": "Potrebni su numerički parametri intensity i count"}), 400
+    return jsonify(get_catalog().nearest(intensity, count))
+
+@catalog_bp.route("/components/range", methods=["GET"])
+def range_components():
+    try:
+        min_intensity = float(request.args.get("min", "-inf"))
+        max_intensity = float(request.args.get("max", "inf"))
+        limit = min(int(request.args.get("limit", 100)), MAX_RANGE_RESULTS)
+    except ValueError:
+        return jsonify({"error": "Parametri min, max i limit moraju biti brojevi"}), 400
+
+    catalog = get_catalog()
+    start, end = catalog.intensity_range(min_intensity, max_intensity)
+    return jsonify({
+        "count": end - start,
+        "components": catalog.records(start, min(end, start + limit))
+    })
+
+@catalog_bp.route("/stats", methods=["GET"])
+def catalog_stats():
+    catalog = get_catalog()
+    return jsonify({"size": len(catalog), "version": catalog.version})
@@ -1,41 +1,34 @@
+import math
+
+import numpy as np
 from flask import Blueprint, request, jsonify
 
+from services.alligation import CRITERIA, best_solutions, solutions_page
+from services.api import cached_get, canonical_number, compact_requested, respond
+from services.cache import register_cache
+from services.catalog import get_catalog
+from services.metrics import stage
+from services.ratio import format_simplified_ratio, simplify_ratio
+from services.schema import SchemaError, array, boolean, compile_schema, integer, number, optional
+
 complex_bp = Blueprint('complex_mix', __name__)
 
-def gcd_multiple(numbers):
-    # Zajednički djelitelj za više brojeva
-    def gcd(a, b):
-        return int(b == 0 and a or gcd(b, a % b))
-    
-    result = int(numbers[0])
-    for i in range(1, len(numbers)):
-        result = gcd(result, int(numbers[i]))
-    return result
+# Cache rješenja neovisan o ukupnoj količini
+solution_cache = register_cache("complex_mix")
 
-def format_simplified_ratio(ratios):
-    """Stvara pojednostavljeni omjer s cijelim brojevima"""
-    # Pronađi maksimalni broj decimalnih mjesta
-    max_decimals = 0
-    for ratio in ratios:
-        str_ratio = f"{ratio:.10f}".rstrip('0')
-        if '.' in str_ratio:
-            decimals = len(str_ratio.split('.')[1])
-            max_decimals = max(max_decimals, decimals)
-    
-    # Pretvori u cijele brojeve množenjem s 10^max_decimals
-    multiplier = 10 ** max_decimals
-    int_ratios = [round(ratio * multiplier) for ratio in ratios]
-    
-    # Osiguraj da su svi pozitivni i minimalno 1
-    int_ratios = [max(1, abs(r)) for r in int_ratios]
-    
-    # Pronađi najveći zajednički djelitelj za skraćivanje
-    if len(int_ratios) > 1 and all(r > 0 for r in int_ratios):
-        divisor = gcd_multiple(int_ratios)
-        simplified = [r // divisor for r in int_ratios]
-        return " : ".join(map(str, simplified))
-    else:
-        return " : ".join(map(str, int_ratios))
+# Najveći broj recepata u jednom batch zahtjevu
+MAX_BATCH_RECIPES = 200_000
+
+# Najveći broj ciljanih intenziteta u jednom sweep zahtjevu
+MAX_SWEEP_POINTS = 100_000
+
+# Ograničenja za opći izračun s više komponenti; pregled jedne sheme traje
+# 25-45 µs (20-50 komponenti), pa je najgori zahtjev oko 0.3 s
+MAX_COMPONENTS = 30
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 500
+DEFAULT_MAX_SCAN = 2000
+MAX_SCAN = 10_000
 
 def calculate_average_intensity(components_data, quantities):
     """Izračunava ponderirani prosječni intenzitet smjese"""
@@ -49,12 +42,8 @@ def calculate_average_intensity(components_data, quantities):
     
     return total_weighted_intensity / total_quantity if total_quantity > 0 else 0
 
-def generate_mix_3_components(components_data, total_amount, desired_intensity):
-    """Generiraj smjesu za 3 komponente"""
-    # Sortiraj komponente po intenzitetu (uzlazno)
-    sorted_components = sorted(components_data, key=lambda x: x['intensity'])
-    intensities = [comp['intensity'] for comp in sorted_components]
-    
+def _solve_3_sorted(intensities, desired_intensity):
+    """Omjeri za 3 sortirane komponente; ne ovise o ukupnoj količini"""
     # Podijeli na lošije i bolje komponente prema željenom intenzitetu
     worse_components = [intensity for intensity in intensities if intensity < desired_intensity]
     better_components = [intensity for intensity in intensities if intensity > desired_intensity]
@@ -65,45 +54,22 @@ def generate_mix_3_components(components_data, total_amount, desired_intensity):
         return {"error": "Željeni intenzitet ne može biti jednak intenzitetu bilo koje komponente"}
     
     # Izračunaj omjere koristeći jednostavan način sparivanja
-    ratios = [0.0, 0.0, 0.0]
+    sum_better = sum(better - desired_intensity for better in better_components)
+    sum_worse = sum(desired_intensity - worse for worse in worse_components)
+    ratios = [sum_better if intensity < desired_intensity else sum_worse for intensity in intensities]
     
-    for i, intensity in enumerate(intensities):
-        if intensity in worse_components:
-            ratios[i] = sum(better - desired_intensity for better in better_components)
-        else:  # bolja komponenta
-            ratios[i] = sum(desired_intensity - worse for worse in worse_components)
-    
-    # Izračunaj količine
     if sum(ratios) == 0:
         return {"error": "Nemoguće izračunati omjere"}
     
-    k = total_amount / sum(ratios)
-    quantities = [ratio * k for ratio in ratios]
-    
     # Provjeri prosječni intenzitet
-    avg_intensity = sum(intensities[i] * quantities[i] for i in range(3)) / sum(quantities)
+    avg_intensity = sum(intensities[i] * ratios[i] for i in range(3)) / sum(ratios)
     if abs(avg_intensity - desired_intensity) > 0.01:
         return {"error": f"Prosječni intenzitet {avg_intensity:.2f} ne odgovara željenom {desired_intensity}"}
     
-    # Mapiraj natrag na originalni redoslijed
-    original_order_quantities = [0] * 3
-    for i, comp in enumerate(components_data):
-        for j, sorted_comp in enumerate(sorted_components):
-            if comp['intensity'] == sorted_comp['intensity']:
-                original_order_quantities[i] = quantities[j]
-                break
-    
-    return {
-        'quantities': original_order_quantities,
-        'ratios': [ratios[intensities.index(comp['intensity'])] for comp in components_data]
-    }
+    return {"solutions": [{"ratios": ratios, "combination": "Jedno rješenje"}]}
 
-def generate_mix_4_components(components_data, total_amount, desired_intensity):
-    """Generiraj smjesu za 4 komponente prema strogim pravilima iz udžbenika"""
-    # Sortiraj komponente po intenzitetu (uzlazno)
-    sorted_components = sorted(components_data, key=lambda x: x['intensity'])
-    intensities = [comp['intensity'] for comp in sorted_components]
-    
+def _solve_4_sorted(intensities, desired_intensity):
+    """Omjeri za 4 sortirane komponente prema strogim pravilima iz udžbenika"""
     # Podijeli na lošije i bolje komponente
     worse_components = [intensity for intensity in intensities if intensity < desired_intensity]
     better_components = [intensity for intensity in intensities if intensity > desired_intensity]
@@ -113,209 +79,713 @@ def generate_mix_4_components(components_data, total_amount, desired_intensity):
     if equal_components:
         return {"error": "Željeni intenzitet ne može biti jednak intentitetu bilo koje komponente"}
     
-    valid_solutions = []
+    candidates = []
     
     # Scenarij 1: 2 lošije + 2 bolje (1-na-1 sparivanje s 2 izbora)
+    # Komponente su sortirane pa su lošije na indeksima 0, 1, a bolje na 2, 3
     if len(worse_components) == 2 and len(better_components) == 2:
-        worse_indices = [i for i, x in enumerate(intensities) if x in worse_components]
-        better_indices = [i for i, x in enumerate(intensities) if x in better_components]
-        
         # Prvi izbor: worse[0]↔better[0], worse[1]↔better[1]
-        ratios_1 = [0.0, 0.0, 0.0, 0.0]
-        ratios_1[worse_indices[0]] = better_components[0] - desired_intensity
-        ratios_1[worse_indices[1]] = better_components[1] - desired_intensity
-        ratios_1[better_indices[0]] = desired_intensity - worse_components[0]
-        ratios_1[better_indices[1]] = desired_intensity - worse_components[1]
-        
-        if all(r > 0 for r in ratios_1):
-            k1 = total_amount / sum(ratios_1)
-            quantities_1 = [r * k1 for r in ratios_1]
-            
-            # Provjeri prosječni intenzitet
-            avg_intensity_1 = sum(intensities[i] * quantities_1[i] for i in range(4)) / sum(quantities_1)
-            if abs(avg_intensity_1 - desired_intensity) < 0.01:
-                valid_solutions.append({
-                    'quantities': quantities_1,
-                    'ratios': ratios_1,
-                    'combination': 'Prvi izbor'
-                })
+        candidates.append(([
+            better_components[0] - desired_intensity,
+            better_components[1] - desired_intensity,
+            desired_intensity - worse_components[0],
+            desired_intensity - worse_components[1],
+        ], 'Prvi izbor'))
         
         # Drugi izbor: worse[0]↔better[1], worse[1]↔better[0]
-        ratios_2 = [0.0, 0.0, 0.0, 0.0]
-        ratios_2[worse_indices[0]] = better_components[1] - desired_intensity
-        ratios_2[worse_indices[1]] = better_components[0] - desired_intensity
-        ratios_2[better_indices[0]] = desired_intensity - worse_components[1]
-        ratios_2[better_indices[1]] = desired_intensity - worse_components[0]
-        
-        if all(r > 0 for r in ratios_2):
-            k2 = total_amount / sum(ratios_2)
-            quantities_2 = [r * k2 for r in ratios_2]
-            
-            # Provjeri prosječni intenzitet
-            avg_intensity_2 = sum(intensities[i] * quantities_2[i] for i in range(4)) / sum(quantities_2)
-            if abs(avg_intensity_2 - desired_intensity) < 0.01:
-                valid_solutions.append({
-                    'quantities': quantities_2,
-                    'ratios': ratios_2,
-                    'combination': 'Drugi izbor'
-                })
+        candidates.append(([
+            better_components[1] - desired_intensity,
+            better_components[0] - desired_intensity,
+            desired_intensity - worse_components[1],
+            desired_intensity - worse_components[0],
+        ], 'Drugi izbor'))
     
     # Scenarij 2: 3 lošije + 1 bolja (svaka lošija se sparuje s istom boljom)
-    elif len(worse_components) == 3 and len(better_components) == 1:
-        ratios = [0.0, 0.0, 0.0, 0.0]
-        
-        # Svaka lošija komponenta se sparuje s jedinom boljom komponentom
-        # Bolja komponenta dobiva zbroj svih omjera sparivanja
-        for i, intensity in enumerate(intensities):
-            if intensity in worse_components:
-                ratios[i] = better_components[0] - desired_intensity
-            else:  # bolja komponenta
-                ratios[i] = sum(desired_intensity - worse for worse in worse_components)
-        
-        if all(r > 0 for r in ratios):
-            k = total_amount / sum(ratios)
-            quantities = [r * k for r in ratios]
-            
-            # Provjeri prosječni intenzitet
-            avg_intensity = sum(intensities[i] * quantities[i] for i in range(4)) / sum(quantities)
-            if abs(avg_intensity - desired_intensity) < 0.01:
-                valid_solutions.append({
-                    'quantities': quantities,
-                    'ratios': ratios,
-                    'combination': 'Jedno rješenje'
-                })
-    
     # Scenarij 3: 1 lošija + 3 bolje (jedna lošija se sparuje sa svakom boljom)
-    elif len(worse_components) == 1 and len(better_components) == 3:
-        ratios = [0.0, 0.0, 0.0, 0.0]
-        
-        # Jedna lošija komponenta se sparuje sa svakom boljom komponentom
-        # Lošija komponenta dobiva zbroj svih omjera sparivanja
-        for i, intensity in enumerate(intensities):
-            if intensity in worse_components:
-                ratios[i] = sum(better - desired_intensity for better in better_components)
-            else:  # bolja komponenta
-                ratios[i] = desired_intensity - worse_components[0]
-        
+    # U oba slučaja lošija dobiva zbroj razlika boljih, a bolja zbroj razlika lošijih
+    elif (len(worse_components), len(better_components)) in [(3, 1), (1, 3)]:
+        sum_better = sum(better - desired_intensity for better in better_components)
+        sum_worse = sum(desired_intensity - worse for worse in worse_components)
+        candidates.append((
+            [sum_better if intensity < desired_intensity else sum_worse for intensity in intensities],
+            'Jedno rješenje'
+        ))
+    
+    valid_solutions = []
+    for ratios, combination in candidates:
         if all(r > 0 for r in ratios):
-            k = total_amount / sum(ratios)
-            quantities = [r * k for r in ratios]
-            
             # Provjeri prosječni intenzitet
-            avg_intensity = sum(intensities[i] * quantities[i] for i in range(4)) / sum(quantities)
+            avg_intensity = sum(intensities[i] * ratios[i] for i in range(4)) / sum(ratios)
             if abs(avg_intensity - desired_intensity) < 0.01:
-                valid_solutions.append({
-                    'quantities': quantities,
-                    'ratios': ratios,
-                    'combination': 'Jedno rješenje'
-                })
+                valid_solutions.append({'ratios': ratios, 'combination': combination})
     
     # Vrati rješenja
     if not valid_solutions:
         return {"error": f"Nema valjalnih rješenja za željeni intenzitet {desired_intensity}"}
     
-    # Mapiraj sva rješenja natrag na originalni redoslijed
+    return {"solutions": valid_solutions}
+
+def _solve_sorted(intensities, desired_intensity):
+    """Rješava sortirane komponente i priprema skraćene omjere za cache"""
+    solver = _solve_3_sorted if len(intensities) == 3 else _solve_4_sorted
+    result = solver(intensities, desired_intensity)
+    # Intenziteti blizu granice raspona brojeva mogu dati beskonačne omjere
+    if any(not math.isfinite(sum(solution["ratios"])) for solution in result.get("solutions", [])):
+        return {"error": "Izračun nije moguć za zadane vrijednosti"}
+    with stage("simplify"):
+        for solution in result.get("solutions", []):
+            solution["simplified"] = simplify_ratio(solution["ratios"])
+    return result
+
+def _cached_solution(components_data, desired_intensity):
+    """Vraća rješenja u sortiranom redoslijedu i mapiranje na originalni redoslijed
+
+    Omjeri ovise samo o intenzitetima i željenom intenzitetu, pa se cache
+    ključ sastoji od sortiranih intenziteta i cilja; ukupna količina samo
+    skalira rezultat.
+    """
+    # Stabilno sortiranje kao u batch izračunu: jednaki intenziteti dobivaju
+    # zasebne sortirane pozicije, pa je mapiranje permutacija
+    order = sorted(range(len(components_data)), key=lambda i: components_data[i]['intensity'])
+    intensities = [components_data[i]['intensity'] for i in order]
+    key = (tuple(intensities), desired_intensity)
+    result = solution_cache.get_or_compute(key, lambda: _solve_sorted(intensities, desired_intensity))
+
+    positions = [0] * len(order)
+    for j, i in enumerate(order):
+        positions[i] = j
+    return result, positions
+
+def _map_solution(solution, positions, total_amount):
+    """Skalira rješenje na ukupnu količinu i vraća ga u originalnom redoslijedu"""
+    k = total_amount / sum(solution['ratios'])
+    ratios = [solution['ratios'][j] for j in positions]
+    simplified_ratio = " : ".join(str(solution['simplified'][j]) for j in positions)
+    return {
+        'quantities': [solution['ratios'][j] * k for j in positions],
+        'ratios': ratios,
+        'simplified_ratio': simplified_ratio
+    }
+
+def generate_mix_3_components(components_data, total_amount, desired_intensity):
+    """Generiraj smjesu za 3 komponente"""
+    result, positions = _cached_solution(components_data, desired_intensity)
+    if "error" in result:
+        return result
+    return _map_solution(result['solutions'][0], positions, total_amount)
+
+def generate_mix_4_components(components_data, total_amount, desired_intensity):
+    """Generiraj smjesu za 4 komponente prema strogim pravilima iz udžbenika"""
+    result, positions = _cached_solution(components_data, desired_intensity)
+    if "error" in result:
+        return result
+    
     all_solutions_mapped = []
-    for solution in valid_solutions:
-        original_order_quantities = [0] * 4
-        for i, comp in enumerate(components_data):
-            for j, sorted_comp in enumerate(sorted_components):
-                if comp['intensity'] == sorted_comp['intensity']:
-                    original_order_quantities[i] = solution['quantities'][j]
-                    break
-        
-        all_solutions_mapped.append({
-            'quantities': original_order_quantities,
-            'ratios': [solution['ratios'][intensities.index(comp['intensity'])] for comp in components_data],
-            'simplified_ratio': format_simplified_ratio([solution['ratios'][intensities.index(comp['intensity'])] for comp in components_data]),
-            'combination_used': solution['combination']
-        })
+    for solution in result['solutions']:
+        mapped = _map_solution(solution, positions, total_amount)
+        mapped['combination_used'] = solution['combination']
+        all_solutions_mapped.append(mapped)
     
     return {
         'all_solutions': all_solutions_mapped,
-        'valid_solutions_count': len(valid_solutions)
+        'valid_solutions_count': len(all_solutions_mapped)
+    }
+
+def _paging_options(data):
+    """Parsira opcije straničenja; vraća None ako nisu zadane"""
+    if not any(key in data for key in ("cursor", "page_size", "mode")):
+        return None
+
+    mode = data.get("mode", "page")
+    if mode not in ("page", "best"):
+        return {"error": "Način mora biti 'page' ili 'best'"}
+    try:
+        offset = int(data.get("cursor") or 0)
+        page_size = int(data.get("page_size", DEFAULT_PAGE_SIZE))
+        max_scan = int(data.get("max_scan", DEFAULT_MAX_SCAN))
+    except (TypeError, ValueError):
+        return {"error": "Neispravan cursor, page_size ili max_scan"}
+    if offset < 0 or not 1 <= page_size <= MAX_PAGE_SIZE or not 1 <= max_scan <= MAX_SCAN:
+        return {"error": f"page_size mora biti između 1 i {MAX_PAGE_SIZE}, a max_scan između 1 i {MAX_SCAN}"}
+    # Svaka stranica ponovno prolazi sheme od početka, pa je cursor ograničen
+    if offset + page_size > MAX_SCAN:
+        return {"error": f"Cursor i page_size zajedno mogu obuhvatiti najviše {MAX_SCAN} rješenja"}
+
+    criterion = data.get("criterion", "balanced")
+    if mode == "best" and criterion not in CRITERIA:
+        return {"error": f"Kriterij mora biti jedan od: {', '.join(CRITERIA)}"}
+
+    return {"mode": mode, "offset": offset, "page_size": page_size, "criterion": criterion, "max_scan": max_scan}
+
+def generate_mix_n_components(components_data, total_amount, desired_intensity, paging):
+    """Generiraj stranicu rješenja za proizvoljan broj komponenti"""
+    intensities = [comp['intensity'] for comp in components_data]
+
+    if desired_intensity in intensities:
+        return {"error": "Željeni intenzitet ne može biti jednak intenzitetu bilo koje komponente"}
+
+    next_cursor = None
+    if paging["mode"] == "best":
+        solutions = best_solutions(
+            intensities, desired_intensity, paging["criterion"], paging["page_size"], paging["max_scan"]
+        )
+        start = 0
+    else:
+        solutions, has_more = solutions_page(
+            intensities, desired_intensity, paging["offset"], paging["page_size"], MAX_SCAN
+        )
+        start = paging["offset"]
+        if has_more and paging["offset"] + len(solutions) < MAX_SCAN:
+            next_cursor = str(paging["offset"] + len(solutions))
+
+    if not solutions:
+        return {"error": f"Nema valjalnih rješenja za željeni intenzitet {desired_intensity}"}
+
+    all_solutions = []
+    for index, solution in enumerate(solutions, start=start + 1):
+        ratios = solution['ratios']
+        k = total_amount / sum(ratios)
+        with stage("simplify"):
+            simplified_ratio = format_simplified_ratio(ratios)
+        all_solutions.append({
+            'quantities': [ratio * k for ratio in ratios],
+            'ratios': ratios,
+            'simplified_ratio': simplified_ratio,
+            'combination_used': f"Rješenje {index}",
+            'pairs': solution['pairs']
+        })
+
+    return {
+        'all_solutions': all_solutions,
+        'valid_solutions_count': len(all_solutions),
+        'next_cursor': next_cursor
+    }
+
+# Ulaz složene smjese; komponente iz kataloga zadaju se samo ID-om
+COMPONENT_SCHEMA = compile_schema({
+    "name": optional(str),
+    "intensity": optional(number("Intenzitet komponente {index} mora biti broj")),
+    "id": optional(integer("ID komponente {index} mora biti cijeli broj")),
+}, message="Komponenta {index} mora biti objekt")
+
+COMPLEX_SCHEMA = compile_schema({
+    "components": array(
+        COMPONENT_SCHEMA, 3, MAX_COMPONENTS,
+        message="Komponente moraju biti lista",
+        length_message=f"Podržano je od 3 do {MAX_COMPONENTS} komponenti"
+    ),
+    "total_amount": optional(number(), 0.0),
+    "desired_intensity": number(),
+})
+
+def _resolve_components(components):
+    """Dopunjuje komponente zadane samo ID-om podacima iz kataloga; vraća grešku ili None"""
+    for i, comp in enumerate(components):
+        if comp['intensity'] is None and comp['id'] is not None:
+            stored = get_catalog().get(comp['id'])
+            if stored is None:
+                return {"error": f"Komponenta {comp['id']} ne postoji u katalogu"}
+            comp['name'] = comp['name'] or stored['name']
+            comp['intensity'] = stored['intensity']
+        if comp['intensity'] is None:
+            return {"error": f"Komponenta {i+1} mora imati intenzitet"}
+    return None
+
+def calculate_complex_mix(data, compact=False):
+    """Izračun složene smjese za jedan zahtjev; greške se vraćaju pod ključem 'error'
+
+    U sažetom obliku (compact) izostavljaju se formatirane količine, omjeri
+    i podaci po komponentama.
+    """
+    try:
+        with stage("validate"):
+            values = COMPLEX_SCHEMA(data)
+            components = values["components"]
+            total_amount = values["total_amount"]
+            desired_intensity = values["desired_intensity"]
+
+            paging = _paging_options(data)
+            if paging is not None and "error" in paging:
+                return paging
+
+            if total_amount <= 0:
+                return {"error": "Ukupna količina mora biti veća od 0"}
+
+            error = _resolve_components(components)
+            if error is not None:
+                return error
+
+            # Validiraj raspon intenziteta
+            intensities = [comp['intensity'] for comp in components]
+            min_intensity = min(intensities)
+            max_intensity = max(intensities)
+
+            if not (min_intensity < desired_intensity < max_intensity):
+                return {
+                    "error": f"Željeni intenzitet {desired_intensity} mora biti između {min_intensity} i {max_intensity}"
+                }
+
+        # Generiraj smjesu na temelju broja komponenti
+        if len(components) > 4 and paging is None:
+            paging = {"mode": "page", "offset": 0, "page_size": DEFAULT_PAGE_SIZE}
+
+        with stage("solve"):
+            if paging is not None:
+                mix_result = generate_mix_n_components(components, total_amount, desired_intensity, paging)
+            elif len(components) == 3:
+                mix_result = generate_mix_3_components(components, total_amount, desired_intensity)
+            else:  # 4 komponente
+                mix_result = generate_mix_4_components(components, total_amount, desired_intensity)
+    except SchemaError as e:
+        return {"error": str(e)}
+    except ArithmeticError:
+        # Npr. beskonačni omjeri za intenzitete na granici raspona brojeva
+        return {"error": "Izračun nije moguć za zadane vrijednosti"}
+
+    if "error" in mix_result:
+        return mix_result
+
+    # Obradi različite formate odgovora
+    if "all_solutions" in mix_result:
+        # Više rješenja (4 ili više komponenti)
+        all_solutions = mix_result['all_solutions']
+        if compact:
+            for solution in all_solutions:
+                del solution['ratios']
+        return {
+            "total_amount": total_amount,
+            "method_details": {
+                "all_solutions": all_solutions,
+                "valid_solutions_count": mix_result['valid_solutions_count'],
+                "next_cursor": mix_result.get('next_cursor')
+            }
+        }
+
+    # Jedno rješenje (3 komponente)
+    quantities = mix_result['quantities']
+    avg_intensity = calculate_average_intensity(components, quantities)
+    simplified_ratio = mix_result['simplified_ratio']
+    if compact:
+        return {
+            "quantities": quantities,
+            "simplified_ratio": simplified_ratio,
+            "average_intensity": round(avg_intensity, 2),
+            "total_amount": total_amount
+        }
+
+    quantities_formatted = [f"{q:.2f}" for q in quantities]
+
+    # Pripremi rezultate komponenti
+    component_results = []
+    for i, comp in enumerate(components):
+        component_results.append({
+            'name': comp['name'] or f"Komponenta {i + 1}",
+            'intensity': comp['intensity'],
+            'quantity': quantities[i],
+            'quantity_formatted': quantities_formatted[i],
+            'percentage': (quantities[i] / total_amount) * 100
+        })
+
+    return {
+        "components": component_results,
+        "quantities": quantities,
+        "quantities_formatted": quantities_formatted,
+        "simplified_ratio": simplified_ratio,
+        "average_intensity": round(avg_intensity, 2),
+        "total_amount": total_amount
     }
 
 @complex_bp.route("/complex", methods=["POST"])
 def complex_mix():
-    data = request.json
-    
+    result = calculate_complex_mix(request.get_json(silent=True), compact=compact_requested())
+    return respond(result)
+
+def _complex_from_args(args):
+    """Zahtjev složene smjese iz GET parametara (ponovljeni intensity i name)"""
+    intensities = args.getlist("intensity")
+    names = args.getlist("name")
+    if names and len(names) != len(intensities):
+        raise SchemaError("Broj naziva mora odgovarati broju intenziteta")
+    components = [{"intensity": intensity} for intensity in intensities]
+    for comp, name in zip(components, names):
+        comp["name"] = name
+    data = {
+        "components": components,
+        "total_amount": args.get("total_amount"),
+        "desired_intensity": args.get("desired_intensity"),
+    }
+    data.update({key: args[key] for key in ("mode", "cursor", "page_size", "criterion", "max_scan") if key in args})
+    return data
+
+def _canonical_complex_params(values, paging):
+    """Normalizirani parametri; opcije straničenja samo ako utječu na rezultat"""
+    components = values["components"]
+    params = [("intensity", canonical_number(comp["intensity"])) for comp in components]
+    params += [("name", comp["name"]) for comp in components if comp["name"] is not None]
+    params += [
+        ("total_amount", canonical_number(values["total_amount"])),
+        ("desired_intensity", canonical_number(values["desired_intensity"])),
+    ]
+    if paging is not None:
+        params += [("mode", paging["mode"]), ("page_size", str(paging["page_size"]))]
+        if paging["mode"] == "best":
+            params += [("criterion", paging["criterion"]), ("max_scan", str(paging["max_scan"]))]
+        else:
+            params += [("cursor", str(paging["offset"]))]
+    return params
+
+@complex_bp.route("/complex", methods=["GET"])
+def complex_mix_get():
+    """Kanonski GET oblik /complex?intensity=..&intensity=..&total_amount=..&desired_intensity=.."""
     try:
-        # Parsiraj ulaz
-        components = data.get("components", [])
-        total_amount = float(data.get("total_amount", 0))
-        desired_intensity = float(data.get("desired_intensity"))
-        
-        # Validacija
-        if len(components) not in [3, 4]:
-            return jsonify({"error": "Podržano je točno 3 ili 4 komponente"}), 400
-            
-        if total_amount <= 0:
-            return jsonify({"error": "Ukupna količina mora biti veća od 0"}), 400
-
-        # Validiraj komponente
-        for i, comp in enumerate(components):
-            if 'intensity' not in comp:
-                return jsonify({"error": f"Komponenta {i+1} mora imati intenzitet"}), 400
-            comp['intensity'] = float(comp['intensity'])
-
-        # Validiraj raspon intenziteta
-        intensities = [comp['intensity'] for comp in components]
-        min_intensity = min(intensities)
-        max_intensity = max(intensities)
-        
-        if not (min_intensity < desired_intensity < max_intensity):
-            return jsonify({
-                "error": f"Željeni intenzitet {desired_intensity} mora biti između {min_intensity} i {max_intensity}"
-            }), 400
-        
-        # Generiraj smjesu na temelju broja komponenti
-        if len(components) == 3:
-            mix_result = generate_mix_3_components(components, total_amount, desired_intensity)
-        else:  # 4 komponente
-            mix_result = generate_mix_4_components(components, total_amount, desired_intensity)
-        
-        if "error" in mix_result:
-            return jsonify(mix_result), 400
-        
-        # Obradi različite formate odgovora
-        if "all_solutions" in mix_result:
-            # Više rješenja (4 komponente)
-            return jsonify({
-                "total_amount": total_amount,
-                "method_details": {
-                    "all_solutions": mix_result['all_solutions'],
-                    "valid_solutions_count": mix_result['valid_solutions_count']
-                }
-            })
+        data = _complex_from_args(request.args)
+        values = COMPLEX_SCHEMA(data)
+    except SchemaError as e:
+        return respond({"error": str(e)})
+    paging = _paging_options(data)
+    if paging is not None and "error" in paging:
+        return respond(paging)
+    return cached_get(
+        _canonical_complex_params(values, paging),
+        lambda: calculate_complex_mix(data, compact=compact_requested())
+    )
+
+def generate_mix_batch(intensities, total_amounts, desired_intensities):
+    """Rješava mnogo recepata s istim brojem komponenti (3 ili 4) odjednom
+
+    Ulaz je polje intenziteta oblika (R, n) te polja ukupnih količina i željenih
+    intenziteta oblika (R,). Scenariji 2+2, 3+1 i 1+3 obrađuju se maskama.
+    Vraća količine i omjere oblika (R, 2, n) u originalnom redoslijedu
+    komponenti (NaN za nepostojeće rješenje) te listu grešaka po receptu.
+    """
+    intensities = np.asarray(intensities, dtype=np.float64)
+    total_amounts = np.asarray(total_amounts, dtype=np.float64)
+    desired = np.asarray(desired_intensities, dtype=np.float64)[:, None]
+    count, n = intensities.shape
+
+    # Sortiraj komponente po intenzitetu i zapamti inverznu permutaciju
+    order = np.argsort(intensities, axis=1, kind="stable")
+    inverse = np.argsort(order, axis=1, kind="stable")
+    s = np.take_along_axis(intensities, order, axis=1)
+
+    # Podijeli na lošije i bolje komponente maskama
+    worse = s < desired
+    better = s > desired
+    equal = (s == desired).any(axis=1)
+    worse_count = worse.sum(axis=1)
+    better_count = better.sum(axis=1)
+
+    # Sparivanje jedne ili više lošijih s jednom ili više boljih (3 komponente, 3+1, 1+3)
+    sum_better = np.where(better, s - desired, 0.0).sum(axis=1, keepdims=True)
+    sum_worse = np.where(worse, desired - s, 0.0).sum(axis=1, keepdims=True)
+    single = np.where(worse, sum_better, sum_worse)
+
+    ratios = np.full((count, 2, n), np.nan)
+    ratios[:, 0] = single
+
+    # Scenarij 2+2: dva izbora 1-na-1 sparivanja
+    pair = (n == 4) & (worse_count == 2) & (better_count == 2)
+    if pair.any():
+        sp = s[pair]
+        dp = desired[pair]
+        ratios[pair, 0] = np.column_stack([sp[:, 2] - dp[:, 0], sp[:, 3] - dp[:, 0], dp[:, 0] - sp[:, 0], dp[:, 0] - sp[:, 1]])
+        ratios[pair, 1] = np.column_stack([sp[:, 3] - dp[:, 0], sp[:, 2] - dp[:, 0], dp[:, 0] - sp[:, 1], dp[:, 0] - sp[:, 0]])
+
+    # Odbaci rješenja s nepozitivnim omjerima ili pogrešnim prosječnim intenzitetom
+    with np.errstate(invalid="ignore", divide="ignore"):
+        positive = (ratios > 0).all(axis=2)
+        ratio_sums = ratios.sum(axis=2, keepdims=True)
+        quantities = ratios * (total_amounts[:, None, None] / ratio_sums)
+        avg_intensity = (quantities * s[:, None, :]).sum(axis=2) / quantities.sum(axis=2)
+        matches = np.abs(avg_intensity - desired) < 0.01
+    valid = positive & matches
+    ratios[~valid] = np.nan
+    quantities[~valid] = np.nan
+
+    # Mapiraj natrag na originalni redoslijed
+    inverse = np.broadcast_to(inverse[:, None, :], ratios.shape)
+    ratios = np.take_along_axis(ratios, inverse, axis=2)
+    quantities = np.take_along_axis(quantities, inverse, axis=2)
+
+    errors = [None] * count
+    for i in np.flatnonzero(equal | ~valid.any(axis=1)).tolist():
+        if equal[i]:
+            errors[i] = "Željeni intenzitet ne može biti jednak intenzitetu bilo koje komponente"
         else:
-            # Jedno rješenje (3 komponente)
-            quantities = mix_result['quantities']
-            avg_intensity = calculate_average_intensity(components, quantities)
-            quantities_formatted = [f"{q:.2f}" for q in quantities]
-            simplified_ratio = format_simplified_ratio(mix_result['ratios'])
-            
-            # Pripremi rezultate komponenti
-            component_results = []
-            for i, comp in enumerate(components):
-                component_results.append({
-                    'name': comp.get('name', f"Komponenta {i + 1}"),
-                    'intensity': comp['intensity'],
-                    'quantity': quantities[i],
-                    'quantity_formatted': quantities_formatted[i],
-                    'percentage': (quantities[i] / total_amount) * 100
-                })
-            
-            return jsonify({
-                "components": component_results,
-                "quantities": quantities,
-                "quantities_formatted": quantities_formatted,
-                "simplified_ratio": simplified_ratio,
-                "average_intensity": round(avg_intensity, 2),
-                "total_amount": total_amount
-            })
-    
-    except ValueError:
-        return jsonify({"error": "Molimo unesite ispravne numeričke vrijednosti"}), 400
-    except Exception as e:
-        return jsonify({"error": f"Greška: {str(e)}"}), 400
\ No newline at end of file
+            errors[i] = f"Nema valjanih rješenja za željeni intenzitet {desired[i, 0]}"
+
+    return quantities, ratios, pair, errors
+
+def _batch_recipes(data):
+    """Vraća listu (intenziteti, ukupna količina, željeni intenzitet) iz zahtjeva"""
+    if not isinstance(data, dict):
+        raise ValueError("Tijelo zahtjeva mora biti JSON objekt")
+
+    if "recipes" in data:
+        recipes = data["recipes"]
+        if not isinstance(recipes, list):
+            raise ValueError("Polje 'recipes' mora biti lista")
+        rows = []
+        for recipe in recipes:
+            if not isinstance(recipe, dict):
+                rows.append((None, None, None))
+                continue
+            intensities = recipe.get("intensities")
+            if intensities is None and isinstance(recipe.get("components"), list):
+                intensities = [comp.get("intensity") if isinstance(comp, dict) else None for comp in recipe["components"]]
+            rows.append((intensities, recipe.get("total_amount"), recipe.get("desired_intensity")))
+        return rows
+
+    for field in ("intensities", "total_amount", "desired_intensity"):
+        if not isinstance(data.get(field), list):
+            raise ValueError(f"Polje '{field}' mora biti lista")
+    if not len(data["intensities"]) == len(data["total_amount"]) == len(data["desired_intensity"]):
+        raise ValueError("Svi stupci moraju imati jednak broj recepata")
+    return list(zip(data["intensities"], data["total_amount"], data["desired_intensity"]))
+
+# Vrijednosti jednog batch recepta; poruke su iste kao za pojedinačni zahtjev
+RECIPE_INTENSITIES = array(
+    number("Intenzitet komponente {index} mora biti broj"), 3, 4,
+    message="Podržano je točno 3 ili 4 komponente"
+)
+RECIPE_NUMBER = number()
+
+def _validate_recipe(intensities, total_amount, desired_intensity):
+    """Validira jedan recept batch zahtjeva; vraća (intenziteti, količina, intenzitet) ili poruku greške"""
+    try:
+        intensities = RECIPE_INTENSITIES(intensities)
+        total_amount = RECIPE_NUMBER(total_amount)
+        desired_intensity = RECIPE_NUMBER(desired_intensity)
+    except SchemaError as e:
+        return str(e)
+
+    if not total_amount > 0:
+        return "Ukupna količina mora biti veća od 0"
+    min_intensity = min(intensities)
+    max_intensity = max(intensities)
+    if not (min_intensity < desired_intensity < max_intensity):
+        return f"Željeni intenzitet {desired_intensity} mora biti između {min_intensity} i {max_intensity}"
+    return intensities, total_amount, desired_intensity
+
+def calculate_complex_batch(rows):
+    """Batch izračun recepata (intenziteti, količina, intenzitet); greške se vraćaju po receptu"""
+    if len(rows) > MAX_BATCH_RECIPES:
+        return {"error": f"Najveći dopušteni broj recepata je {MAX_BATCH_RECIPES}"}
+
+    # Grupiraj ispravne recepte po broju komponenti
+    results = [None] * len(rows)
+    groups = {3: [], 4: []}
+    with stage("validate"):
+        for index, row in enumerate(rows):
+            validated = _validate_recipe(*row)
+            if isinstance(validated, str):
+                results[index] = {"error": validated}
+            else:
+                groups[len(validated[0])].append((index, validated))
+
+    for group in groups.values():
+        if not group:
+            continue
+        indices = [index for index, _ in group]
+        with stage("solve"):
+            quantities, ratios, pair, errors = generate_mix_batch(
+                [validated[0] for _, validated in group],
+                [validated[1] for _, validated in group],
+                [validated[2] for _, validated in group],
+            )
+        has_solution = (~np.isnan(quantities[:, :, 0])).tolist()
+        quantities_list = quantities.tolist()
+        ratios_list = ratios.tolist()
+        pair_list = pair.tolist()
+        for row, index in enumerate(indices):
+            if errors[row] is not None:
+                results[index] = {"error": errors[row]}
+                continue
+            block = {"quantities": [], "simplified_ratio": [], "combinations": []}
+            labels = ("Prvi izbor", "Drugi izbor") if pair_list[row] else ("Jedno rješenje",)
+            for solution, label in enumerate(labels):
+                if not has_solution[row][solution]:
+                    continue
+                block["quantities"].append(quantities_list[row][solution])
+                with stage("simplify"):
+                    block["simplified_ratio"].append(format_simplified_ratio(ratios_list[row][solution]))
+                block["combinations"].append(label)
+            results[index] = block
+
+    return {
+        "count": len(results),
+        "error_count": sum(1 for result in results if "error" in result),
+        "results": results,
+    }
+
+@complex_bp.route("/complex/batch", methods=["POST"])
+def complex_mix_batch():
+    data = request.get_json(silent=True)
+    try:
+        rows = _batch_recipes(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return respond(calculate_complex_batch(rows))
+
+def generate_mix_sweep(intensities, total_amount, targets):
+    """Rješava iste komponente (3 ili 4) za mnogo željenih intenziteta odjednom
+
+    Komponente se sortiraju jednom; svaki cilj se pretraživanjem sortiranih
+    intenziteta svrstava u segment između dviju susjednih komponenti, čime je
+    određena podjela na lošije i bolje (scenarij). Unutar segmenta omjeri su
+    linearni u cilju pa se računaju vektorski za sve točke. Kao i kod batch
+    izračuna, svaka komponenta dobiva omjer svoje sortirane pozicije (stabilno
+    sortiranje), pa količine i uz jednake intenzitete daju ukupnu količinu.
+
+    Vraća količine i omjere oblika (R, 2, n) u originalnom redoslijedu
+    (drugi izbor postoji samo u scenariju 2+2, inače NaN), broj lošijih
+    komponenti po točki (-1 za greške) i listu grešaka.
+    """
+    intensities = np.asarray(intensities, dtype=np.float64)
+    targets = np.asarray(targets, dtype=np.float64)
+    count, n = len(targets), len(intensities)
+
+    order = np.argsort(intensities, kind="stable")
+    inverse = np.argsort(order, kind="stable")
+    sorted_intensities = intensities[order]
+    worse_count = np.searchsorted(sorted_intensities, targets, side="left")
+    outside = ~((sorted_intensities[0] < targets) & (targets < sorted_intensities[-1]))
+    invalid = outside | np.isin(targets, sorted_intensities)
+
+    # Razlike cilja i komponenti; pozitivne za lošije komponente
+    differences = targets[:, None] - sorted_intensities[None, :]
+    is_worse = np.arange(n)[None, :] < worse_count[:, None]
+    sum_worse = np.where(is_worse, differences, 0.0).sum(axis=1, keepdims=True)
+    sum_better = np.where(is_worse, 0.0, -differences).sum(axis=1, keepdims=True)
+
+    # Lošija komponenta dobiva zbroj razlika boljih, bolja zbroj razlika lošijih
+    ratios = np.full((count, 2, n), np.nan)
+    ratios[:, 0] = np.where(is_worse, sum_better, sum_worse)
+
+    if n == 4:
+        # Scenarij 2+2: dva izbora 1-na-1 sparivanja
+        pair = worse_count == 2
+        d = np.abs(differences[pair])
+        ratios[pair, 0] = np.column_stack([d[:, 2], d[:, 3], d[:, 0], d[:, 1]])
+        ratios[pair, 1] = np.column_stack([d[:, 3], d[:, 2], d[:, 1], d[:, 0]])
+
+    # Beskonačni omjeri za intenzitete na granici raspona brojeva
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        ratio_sums = ratios.sum(axis=2, keepdims=True)
+        overflow = ~invalid & ~np.isfinite(ratio_sums[:, 0, 0])
+        invalid |= overflow
+        ratios[invalid] = np.nan
+        quantities = ratios * (total_amount / ratio_sums)
+
+    # Iste poruke kao pojedinačni izračun; raspon se provjerava prije jednakosti
+    errors = [None] * count
+    low, high = float(sorted_intensities[0]), float(sorted_intensities[-1])
+    for i in np.flatnonzero(invalid).tolist():
+        if outside[i]:
+            errors[i] = f"Željeni intenzitet {float(targets[i])} mora biti između {low} i {high}"
+        elif overflow[i]:
+            errors[i] = "Izračun nije moguć za zadane vrijednosti"
+        else:
+            errors[i] = "Željeni intenzitet ne može biti jednak intenzitetu bilo koje komponente"
+
+    worse_count = np.where(invalid, -1, worse_count)
+    return quantities[:, :, inverse], ratios[:, :, inverse], worse_count, errors
+
+SWEEP_SCHEMA = compile_schema({
+    "components": array(
+        COMPONENT_SCHEMA, 3, 4,
+        message="Komponente moraju biti lista",
+        length_message="Podržano je točno 3 ili 4 komponente"
+    ),
+    "total_amount": optional(number(), 0.0),
+    "targets": optional(array(
+        number("Ciljani intenzitet {index} mora biti broj"), 1, MAX_SWEEP_POINTS,
+        message="Polje 'targets' mora biti lista",
+        length_message=f"Lista ciljeva mora imati od 1 do {MAX_SWEEP_POINTS} vrijednosti"
+    )),
+    "start": optional(number()),
+    "stop": optional(number()),
+    "step": optional(number(check=(lambda step: step > 0, "Korak mora biti veći od 0"))),
+    "simplified": optional(boolean("Polje 'simplified' mora biti true ili false"), False),
+})
+
+def _sweep_targets(values, intensities):
+    """Ciljevi iz liste ili iz raspona start..stop s korakom (uključivo)
+
+    Bez start/stop raspon je od najmanjeg do najvećeg intenziteta komponenti.
+    """
+    if values["targets"] is not None:
+        return np.asarray(values["targets"], dtype=np.float64)
+    if values["step"] is None:
+        raise SchemaError("Potrebna je lista 'targets' ili korak 'step'")
+    start = min(intensities) if values["start"] is None else values["start"]
+    stop = max(intensities) if values["stop"] is None else values["stop"]
+    if stop < start:
+        raise SchemaError("Vrijednost 'stop' mora biti veća ili jednaka 'start'")
+    # Mala tolerancija kako bi stop bio uključen unatoč zaokruživanju; vrlo mali
+    # korak daje beskonačan broj koraka pa se provjerava prije pretvorbe u int
+    steps = np.floor((stop - start) / values["step"] + 1e-9)
+    if not steps < MAX_SWEEP_POINTS:
+        raise SchemaError(f"Raspon daje više od {MAX_SWEEP_POINTS} točaka")
+    return start + values["step"] * np.arange(int(steps) + 1)
+
+def calculate_complex_sweep(data):
+    """Količine za iste komponente kroz niz željenih intenziteta"""
+    with stage("validate"):
+        try:
+            values = SWEEP_SCHEMA(data)
+            components = values["components"]
+            error = _resolve_components(components)
+            if error is not None:
+                return error
+            if values["total_amount"] <= 0:
+                return {"error": "Ukupna količina mora biti veća od 0"}
+            intensities = [comp['intensity'] for comp in components]
+            targets = _sweep_targets(values, intensities)
+        except SchemaError as e:
+            return {"error": str(e)}
+
+    total_amount = values["total_amount"]
+    with stage("solve"):
+        quantities, ratios, worse_count, errors = generate_mix_sweep(intensities, total_amount, targets)
+
+    n = len(intensities)
+    has_alternative = ~np.isnan(ratios[:, 1, 0])
+    scenario_labels = {worse: f"{worse}+{n - worse}" for worse in range(1, n)}
+    result = {
+        "components": [
+            {"name": comp['name'] or f"Komponenta {i + 1}", "intensity": comp['intensity']}
+            for i, comp in enumerate(components)
+        ],
+        "total_amount": total_amount,
+        "count": len(targets),
+        "error_count": len(targets) - errors.count(None),
+        "targets": targets.tolist(),
+        "scenario": [scenario_labels.get(worse) for worse in worse_count.tolist()],
+        "quantities": [
+            None if error is not None else row
+            for row, error in zip(quantities[:, 0].tolist(), errors)
+        ],
+        "alternative_quantities": [
+            row if has else None
+            for row, has in zip(quantities[:, 1].tolist(), has_alternative.tolist())
+        ],
+        "errors": errors,
+    }
+
+    if values["simplified"]:
+        with stage("simplify"):
+            result["simplified_ratio"] = [
+                None if error is not None else format_simplified_ratio(row)
+                for row, error in zip(ratios[:, 0].tolist(), errors)
+            ]
+            result["alternative_simplified_ratio"] = [
+                format_simplified_ratio(row) if has else None
+                for row, has in zip(ratios[:, 1].tolist(), has_alternative.tolist())
+            ]
+    return result
+
+@complex_bp.route("/complex/sweep", methods=["POST"])
+def complex_mix_sweep():
+    return respond(calculate_complex_sweep(request.get_json(silent=True)))
@@ -0,0 +1,124 @@
+from flask import Blueprint, request, jsonify, url_for
+
+from routes.complex_mix import _batch_recipes, calculate_complex_batch, calculate_complex_mix
+from routes.simple_mix import BATCH_FIELDS, _batch_columns, calculate_simple_batch
+from services.jobs import RETRY_AFTER, JobQueueFull, get_job_manager
+
+jobs_bp = Blueprint('jobs', __name__)
+
+# Veličina dijela posla koji jedan proces izračunava odjednom
+SIMPLE_CHUNK_ROWS = 100_000
+COMPLEX_CHUNK_RECIPES = 10_000
+
+# Najveći broj redaka odnosno recepata u jednom poslu
+MAX_JOB_ROWS = 10_000_000
+
+def _chunks(function, count, chunk_size, make_args):
+    """Dijeli posao od `count` redaka na dijelove; make_args(start, end) daje argumente funkcije"""
+    return [
+        {"function": function, "args": make_args(start, min(start + chunk_size, count)),
+         "offset": start, "size": min(chunk_size, count - start)}
+        for start in range(0, count, chunk_size)
+    ]
+
+def _simple_batch_job(payload):
+    columns = _batch_columns(payload)
+    count = len(columns["a1"])
+    if count > MAX_JOB_ROWS:
+        raise ValueError(f"Najveći dopušteni broj redaka je {MAX_JOB_ROWS}")
+    chunks = _chunks(calculate_simple_batch, count, SIMPLE_CHUNK_ROWS, lambda start, end: (
+        {field: columns[field][start:end] for field in BATCH_FIELDS},
+    ))
+    return chunks, _merge_simple_batch
+
+def _merge_simple_batch(results):
+    merged = {"count": 0, "error_count": 0, "quantities": [], "quantities_formatted": [],
+              "simplified_ratio": [], "errors": []}
+    for result in results:
+        merged["count"] += result["count"]
+        merged["error_count"] += result["error_count"]
+        for field in ("quantities", "quantities_formatted", "simplified_ratio", "errors"):
+            merged[field].extend(result[field])
+    return merged
+
+def _complex_batch_job(payload):
+    rows = _batch_recipes(payload)
+    if len(rows) > MAX_JOB_ROWS:
+        raise ValueError(f"Najveći dopušteni broj recepata je {MAX_JOB_ROWS}")
+    chunks = _chunks(calculate_complex_batch, len(rows), COMPLEX_CHUNK_RECIPES, lambda start, end: (rows[start:end],))
+    return chunks, _merge_complex_batch
+
+def _merge_complex_batch(results):
+    merged = {"count": 0, "error_count": 0, "results": []}
+    for result in results:
+        merged["count"] += result["count"]
+        merged["error_count"] += result["error_count"]
+        merged["results"].extend(result["results"])
+    return merged
+
+def _complex_job(payload):
+    """Jedan složeni izračun, npr. nabrajanje rješenja za mnogo komponenti"""
+    if not isinstance(payload, dict):
+        raise ValueError("Podaci posla moraju biti JSON objekt")
+    chunks = [{"function": calculate_complex_mix, "args": (payload,), "offset": 0, "size": 1}]
+    return chunks, _first_result
+
+def _first_result(results):
+    return results[0]
+
+# Vrste poslova: svaka pretvara podatke zahtjeva u dijelove i funkciju za spajanje rezultata
+JOB_TYPES = {
+    "simple_batch": _simple_batch_job,
+    "complex_batch": _complex_batch_job,
+    "complex": _complex_job,
+}
+
+@jobs_bp.route("", methods=["POST"])
+def create_job():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or data.get("type") not in JOB_TYPES:
+        return jsonify({"error": f"Vrsta posla mora biti jedna od: {', '.join(JOB_TYPES)}"}), 400
+
+    try:
+        chunks, merge = JOB_TYPES[data["type"]](data.get("payload"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not chunks:
+        return jsonify({"error": "Posao ne sadrži nijedan redak"}), 400
+
+    manager = get_job_manager()
+    try:
+        job_id = manager.submit(data["type"], chunks, merge)
+    except JobQueueFull as e:
+        response = jsonify({"error": str(e)})
+        response.headers["Retry-After"] = str(RETRY_AFTER)
+        return response, 429
+
+    response = jsonify(manager.snapshot(job_id))
+    response.headers["Location"] = url_for("jobs.get_job", job_id=job_id)
+    return response, 202
+
+@jobs_bp.route("", methods=["GET"])
+def list_jobs():
+    manager = get_job_manager()
+    return jsonify({
+        "workers": manager.workers,
+        "pending": manager.pending(),
+        "max_pending": manager.max_pending,
+        "jobs": manager.list()
+    })
+
+@jobs_bp.route("/<job_id>", methods=["GET"])
+def get_job(job_id):
+    partial = request.args.get("partial", "").lower() in ("1", "true", "yes")
+    snapshot = get_job_manager().snapshot(job_id, partial=partial)
+    if snapshot is None:
+        return jsonify({"error": f"Posao {job_id} ne postoji ili je istekao"}), 404
+    return jsonify(snapshot)
+
+@jobs_bp.route("/<job_id>", methods=["DELETE"])
+def cancel_job(job_id):
+    snapshot = get_job_manager().cancel(job_id)
+    if snapshot is None:
+        return jsonify({"error": f"Posao {job_id} ne postoji ili je istekao"}), 404
+    return jsonify(snapshot)
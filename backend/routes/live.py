@@ -0,0 +1,119 @@
+from functools import partial
+
+from flask import Blueprint, Response, current_app, jsonify, request, url_for
+
+from routes.complex_mix import calculate_complex_mix
+from routes.simple_mix import calculate_simple_mix
+from services.api import compact_requested
+from services.live import HEARTBEAT, RETRY_AFTER, LiveSessionLimit, get_session_manager
+
+live_bp = Blueprint('live', __name__)
+
+# Vrste sesija i izračun za svaku; složeni izračun koristi zajednički cache rješenja
+# po sortiranim intenzitetima, pa promjena samo ukupne količine ne rješava ponovno
+SESSION_TYPES = {
+    "simple": calculate_simple_mix,
+    "complex": calculate_complex_mix,
+}
+
+def _not_found(session_id):
+    return jsonify({"error": f"Sesija {session_id} ne postoji ili je istekla"}), 404
+
+def _snapshot(session):
+    return {
+        "id": session.id,
+        "type": session.kind,
+        "version": session.version,
+        "input": session.state,
+        "streams": session.streams,
+        "events": url_for("live.session_events", session_id=session.id),
+    }
+
+@live_bp.route("/sessions", methods=["POST"])
+def create_session():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or data.get("type") not in SESSION_TYPES:
+        return jsonify({"error": f"Vrsta sesije mora biti jedna od: {', '.join(SESSION_TYPES)}"}), 400
+    state = data.get("input") or {}
+    if not isinstance(state, dict):
+        return jsonify({"error": "Ulaz sesije mora biti JSON objekt"}), 400
+
+    compute = partial(SESSION_TYPES[data["type"]], compact=compact_requested())
+    try:
+        session = get_session_manager().create(data["type"], compute, state)
+    except LiveSessionLimit as e:
+        response = jsonify({"error": str(e)})
+        response.headers["Retry-After"] = str(RETRY_AFTER)
+        return response, 429
+
+    response = jsonify(_snapshot(session))
+    response.headers["Location"] = url_for("live.get_session", session_id=session.id)
+    return response, 201
+
+@live_bp.route("/sessions/<session_id>", methods=["GET"])
+def get_session(session_id):
+    session = get_session_manager().get(session_id)
+    if session is None:
+        return _not_found(session_id)
+    return jsonify(_snapshot(session))
+
+@live_bp.route("/sessions/<session_id>", methods=["PATCH"])
+def update_session(session_id):
+    """Spaja poslana polja u ulaz sesije; rezultat stiže kroz otvoreni tok"""
+    patch = request.get_json(silent=True)
+    if not isinstance(patch, dict):
+        return jsonify({"error": "Izmjena mora biti JSON objekt"}), 400
+    session = get_session_manager().get(session_id)
+    if session is None:
+        return _not_found(session_id)
+    return jsonify({"version": session.update(patch)})
+
+@live_bp.route("/sessions/<session_id>", methods=["DELETE"])
+def close_session(session_id):
+    session = get_session_manager().close(session_id)
+    if session is None:
+        return _not_found(session_id)
+    return "", 204
+
+def _sse(body, event=None, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}\n")
+    if event is not None:
+        lines.append(f"event: {event}\n")
+    # Višeredni JSON (debug način) šalje se kao više data redaka
+    lines.extend(f"data: {line}\n" for line in body.splitlines())
+    return "".join(lines) + "\n"
+
+@live_bp.route("/sessions/<session_id>/events", methods=["GET"])
+def session_events(session_id):
+    """Tok rezultata (text/event-stream) za svaku novu verziju ulaza
+
+    Klijent koji se ponovno spaja šalje Last-Event-ID pa ne dobiva rezultat
+    verzije koju je već primio.
+    """
+    session = get_session_manager().get(session_id)
+    if session is None:
+        return _not_found(session_id)
+    try:
+        sent_version = int(request.headers.get("Last-Event-ID", 0))
+    except ValueError:
+        sent_version = 0
+    dumps = current_app.json.dumps
+
+    def stream():
+        # Klijent (EventSource) se nakon prekida ponovno spaja nakon 1 s
+        yield f"retry: 1000\n: heartbeat {HEARTBEAT} s\n\n"
+        for event in session.events(sent_version):
+            if event is None:
+                yield ": ping\n\n"
+                continue
+            version, result = event
+            yield _sse(dumps({"version": version, "result": result}), "result", version)
+        yield _sse(dumps({"id": session.id}), "closed")
+
+    return Response(stream(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        # nginx inače sprema tok u međuspremnik
+        "X-Accel-Buffering": "no",
+    })
@@ -0,0 +1,32 @@
+from flask import Blueprint, Response
+
+from services.api import FastJSONProvider
+from services.cache import CACHES
+from services.metrics import render_metrics, stage
+
+metrics_bp = Blueprint('metrics', __name__)
+
+class TimedJSONProvider(FastJSONProvider):
+    """JSON provider koji mjeri serijalizaciju odgovora kao fazu 'serialize'"""
+
+    def response(self, *args, **kwargs):
+        with stage("serialize"):
+            return super().response(*args, **kwargs)
+
+def _cache_lines():
+    """Statistika cacheva u Prometheus formatu"""
+    lines = []
+    for metric, field, kind in (
+        ("mix_cache_hits_total", "hits", "counter"),
+        ("mix_cache_misses_total", "misses", "counter"),
+        ("mix_cache_evictions_total", "evictions", "counter"),
+        ("mix_cache_size", "size", "gauge"),
+    ):
+        lines.append(f"# TYPE {metric} {kind}")
+        for name, cache in sorted(CACHES.items()):
+            lines.append(f'{metric}{{cache="{name}"}} {cache.stats()[field]}')
+    return lines
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def metrics():
+    return Response(render_metrics(_cache_lines()), mimetype="text/plain; version=0.0.4")
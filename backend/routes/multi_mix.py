@@ -0,0 +1,167 @@
+import numpy as np
+from flask import Blueprint, request
+
+from services.api import compact_requested, respond
+from services.metrics import stage
+from services.multi import solve_blend
+from services.ratio import format_ratio, simplify_ratio
+from services.schema import SchemaError, array, compile_schema, number, optional, string
+
+multi_bp = Blueprint('multi_mix', __name__)
+
+# Ograničenja veličine problema
+MAX_COMPONENTS = 500
+MAX_ATTRIBUTES = 100
+
+# Zadano dopušteno odstupanje svakog atributa (kao provjera prosječnog intenziteta)
+DEFAULT_TOLERANCE = 0.01
+
+# Udjeli manji od ovoga smatraju se nulom
+MIN_SHARE = 1e-9
+
+def _unchecked(value):
+    # Polja koja mogu biti lista ili objekt provjeravaju se u _parse_blend
+    return value
+
+MULTI_SCHEMA = compile_schema({
+    "components": array(
+        _unchecked, 2, MAX_COMPONENTS,
+        message="Komponente moraju biti lista",
+        length_message=f"Podržano je od 2 do {MAX_COMPONENTS} komponenti"
+    ),
+    "targets": _unchecked,
+    "attributes": optional(array(string("Naziv atributa {index} mora biti tekst"), 1, MAX_ATTRIBUTES)),
+    "weights": optional(_unchecked),
+    "tolerance": optional(_unchecked, DEFAULT_TOLERANCE),
+    "total_amount": optional(number(), 0.0),
+})
+
+def _attribute_vector(value, attributes, field, check=None):
+    """Vektor vrijednosti po atributima iz liste ili objekta s nazivima atributa"""
+    coerce = number(f"Vrijednosti u polju '{field}' moraju biti brojevi", check)
+    if isinstance(value, dict):
+        missing = [name for name in attributes if name not in value]
+        if missing:
+            raise SchemaError(f"U polju '{field}' nedostaje atribut '{missing[0]}'")
+        return [coerce(value[name]) for name in attributes]
+    if isinstance(value, list):
+        if len(value) != len(attributes):
+            raise SchemaError(f"Polje '{field}' mora imati {len(attributes)} vrijednosti")
+        return [coerce(item) for item in value]
+    raise SchemaError(f"Polje '{field}' mora biti lista ili objekt")
+
+def _attribute_options(value, attributes, field, check):
+    """Jedan broj za sve atribute ili vektor po atributima"""
+    if isinstance(value, (list, dict)):
+        return _attribute_vector(value, attributes, field, check)
+    return [number(f"Polje '{field}' mora biti broj", check)(value)] * len(attributes)
+
+def _parse_blend(data):
+    """Vraća (nazive komponenti, nazive atributa, svojstva, ciljeve, težine, tolerancije, ukupnu količinu)
+
+    Ciljevi se zadaju objektom {atribut: vrijednost} ili listom uz neobavezno
+    polje `attributes`; svojstva komponenti u istom obliku.
+    """
+    values = MULTI_SCHEMA(data)
+    targets = values["targets"]
+    if isinstance(targets, dict):
+        attributes = list(targets)
+    elif isinstance(targets, list):
+        attributes = values["attributes"] or [f"Atribut {i + 1}" for i in range(len(targets))]
+    else:
+        raise SchemaError("Polje 'targets' mora biti lista ili objekt")
+    if not 1 <= len(attributes) <= MAX_ATTRIBUTES:
+        raise SchemaError(f"Podržano je od 1 do {MAX_ATTRIBUTES} atributa")
+
+    names = []
+    properties = []
+    for i, component in enumerate(values["components"]):
+        if not isinstance(component, dict) or "properties" not in component:
+            raise SchemaError(f"Komponenta {i + 1} mora biti objekt s poljem 'properties'")
+        names.append(component.get("name") or f"Komponenta {i + 1}")
+        properties.append(_attribute_vector(component["properties"], attributes, f"components[{i}].properties"))
+
+    weights = values["weights"]
+    if weights is not None:
+        weights = _attribute_options(weights, attributes, "weights", (lambda w: w > 0, "Težine moraju biti veće od 0"))
+    tolerances = _attribute_options(
+        values["tolerance"], attributes, "tolerance", (lambda t: t >= 0, "Tolerancija ne smije biti negativna")
+    )
+    return (
+        names, attributes, np.array(properties), np.array(_attribute_vector(targets, attributes, "targets")),
+        weights, np.array(tolerances), values["total_amount"]
+    )
+
+def calculate_multi_mix(data, compact=False):
+    """Smjesa koja istodobno pogađa više ciljanih atributa
+
+    Ako cilj nije dostižan unutar tolerancije, vraća se najbliža smjesa s
+    `within_tolerance: false` i odstupanjem po atributu.
+    """
+    with stage("validate"):
+        try:
+            names, attributes, properties, targets, weights, tolerances, total_amount = _parse_blend(data)
+        except SchemaError as e:
+            return {"error": str(e)}
+        if total_amount <= 0:
+            return {"error": "Ukupna količina mora biti veća od 0"}
+
+    with stage("solve"):
+        shares = solve_blend(properties, targets, weights)
+        achieved = shares @ properties
+        deviations = achieved - targets
+        within = np.abs(deviations) <= tolerances
+
+    # U odgovor ulaze samo korištene komponente
+    used = np.flatnonzero(shares > MIN_SHARE)
+    used_quantities = (shares[used] * total_amount).tolist()
+    with stage("simplify"):
+        simplified_ratio = format_ratio(simplify_ratio(used_quantities, places=2))
+
+    attribute_results = [
+        {
+            "name": attributes[k],
+            "target": float(targets[k]),
+            "achieved": float(achieved[k]),
+            "deviation": float(deviations[k]),
+            "within_tolerance": bool(within[k])
+        }
+        for k in range(len(attributes))
+    ]
+
+    if compact:
+        return {
+            "indices": used.tolist(),
+            "quantities": used_quantities,
+            "simplified_ratio": simplified_ratio,
+            "achieved": achieved.tolist(),
+            "within_tolerance": bool(within.all()),
+            "total_amount": total_amount
+        }
+
+    component_results = []
+    for position, i in enumerate(used.tolist()):
+        component_results.append({
+            'index': i,
+            'name': names[i],
+            'properties': dict(zip(attributes, properties[i].tolist())),
+            'quantity': used_quantities[position],
+            'quantity_formatted': f"{used_quantities[position]:.2f}",
+            'percentage': float(shares[i]) * 100
+        })
+
+    return {
+        "components": component_results,
+        "quantities": used_quantities,
+        "quantities_formatted": [f"{q:.2f}" for q in used_quantities],
+        "simplified_ratio": simplified_ratio,
+        "attributes": attribute_results,
+        "within_tolerance": bool(within.all()),
+        "residual": float(np.linalg.norm(deviations)),
+        "total_amount": total_amount
+    }
+
+@multi_bp.route("/multi", methods=["POST"])
+def multi_mix():
+    result = calculate_multi_mix(request.get_json(silent=True), compact=compact_requested())
+    return respond(result)
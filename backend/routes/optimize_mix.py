@@ -0,0 +1,177 @@
+import numpy as np
+from flask import Blueprint, request, jsonify
+
+from routes.simple_mix import _parse_column
+from services.api import compact_requested, respond
+from services.catalog import get_catalog
+from services.optimize import optimize_blend
+from services.ratio import format_ratio, simplify_ratio
+from services.schema import SchemaError, compile_schema, number, optional
+
+optimize_bp = Blueprint('optimize_mix', __name__)
+
+# Najveći broj lotova u zalihi jednog zahtjeva
+MAX_LOTS = 100_000
+
+# Količine manje od ovog udjela ukupne količine smatraju se nulom
+MIN_SHARE = 1e-9
+
+# Provjere vrijednosti jednog lota
+LOT_INTENSITY = number("Intenzitet lota mora biti broj")
+LOT_UNIT_COST = number("Cijena lota mora biti broj")
+LOT_STOCK = number("Zaliha lota mora biti nenegativan broj", (lambda stock: stock >= 0, "Zaliha lota mora biti nenegativan broj"))
+
+# Parametri zahtjeva osim zalihe, koja se čita u stupcima
+OPTIMIZE_SCHEMA = compile_schema({
+    "total_amount": optional(number(), 0.0),
+    "desired_intensity": number(),
+})
+
+class CatalogNames:
+    """Nazivi lotova iz kataloga; čitaju se samo za korištene lotove"""
+
+    def __init__(self, catalog, start):
+        self.catalog = catalog
+        self.start = start
+
+    def __getitem__(self, index):
+        return self.catalog.records(self.start + index, self.start + index + 1)[0]["name"]
+
+def _catalog_lots(selection):
+    """Lotovi iz kataloga u rasponu intenziteta, bez kopiranja stupaca"""
+    selection = selection if isinstance(selection, dict) else {}
+    catalog = get_catalog()
+    bound = number("Granice intenziteta kataloga moraju biti brojevi")
+    start, end = catalog.intensity_range(
+        bound(selection["min_intensity"]) if "min_intensity" in selection else -np.inf,
+        bound(selection["max_intensity"]) if "max_intensity" in selection else np.inf
+    )
+    columns = catalog.columns(start, end)
+    return CatalogNames(catalog, start), columns["intensity"], columns["unit_cost"], columns["stock"], columns["ids"]
+
+def _lot_column(data, field):
+    """Stupac lotova kao float64 polje; svaka vrijednost mora biti konačan broj"""
+    values = data[field]
+    if not isinstance(values, list):
+        raise SchemaError(f"Polje '{field}' mora biti lista")
+    column, invalid = _parse_column(values)
+    if invalid is not None:
+        raise SchemaError(f"Polje '{field}' mora sadržavati brojeve (lot {int(np.argmax(invalid)) + 1})")
+    return column
+
+def _parse_lots(data):
+    """Vraća (nazive, intenzitete, cijene, zalihe, ID-ove iz kataloga) iz zahtjeva"""
+    if "catalog" in data:
+        return _catalog_lots(data["catalog"])
+
+    lots = data.get("lots")
+    if isinstance(lots, list):
+        names, intensities, unit_costs, stock = [], [], [], []
+        for i, lot in enumerate(lots):
+            if not isinstance(lot, dict):
+                raise SchemaError(f"Lot {i + 1} mora biti objekt")
+            try:
+                intensities.append(LOT_INTENSITY(lot["intensity"]))
+                unit_costs.append(LOT_UNIT_COST(lot["unit_cost"]))
+                stock.append(LOT_STOCK(lot["stock"]) if lot.get("stock") is not None else np.inf)
+            except SchemaError as e:
+                raise SchemaError(f"Lot {i + 1}: {e}") from None
+            names.append(lot.get("name", f"Lot {i + 1}"))
+        return names, np.array(intensities), np.array(unit_costs), np.array(stock), None
+
+    intensities = _lot_column(data, "intensity")
+    unit_costs = _lot_column(data, "unit_cost")
+    stock = _lot_column(data, "stock") if data.get("stock") is not None else np.full(len(intensities), np.inf)
+    if (stock < 0).any():
+        raise SchemaError("Zalihe lotova moraju biti nenegativne")
+    names = data.get("names") or [f"Lot {i + 1}" for i in range(len(intensities))]
+    if not len(intensities) == len(unit_costs) == len(stock) == len(names):
+        raise ValueError("Svi stupci moraju imati jednak broj lotova")
+    return names, intensities, unit_costs, stock, None
+
+def calculate_optimal_mix(names, intensities, unit_costs, stock, total_amount, desired_intensity, ids=None,
+                          compact=False):
+    """Najjeftinija smjesa iz zalihe u obliku odgovora složene smjese
+
+    U sažetom obliku (compact) umjesto podataka po lotu vraćaju se samo
+    indeksi korištenih lotova uz količine.
+    """
+    if len(intensities) < 2:
+        return {"error": "Potrebna su najmanje 2 lota"}
+    if len(intensities) > MAX_LOTS:
+        return {"error": f"Najveći dopušteni broj lotova je {MAX_LOTS}"}
+    if total_amount <= 0:
+        return {"error": "Ukupna količina mora biti veća od 0"}
+    if not (np.isfinite(intensities).all() and np.isfinite(unit_costs).all()) or (stock < 0).any():
+        return {"error": "Intenziteti i cijene moraju biti brojevi, a zalihe nenegativne"}
+
+    quantities = optimize_blend(intensities, unit_costs, stock, total_amount, desired_intensity)
+    if isinstance(quantities, dict):
+        return quantities
+
+    # U odgovor ulaze samo korišteni lotovi
+    used = np.flatnonzero(quantities > MIN_SHARE * total_amount)
+    used_quantities = quantities[used].tolist()
+    total_cost = float(unit_costs[used] @ quantities[used])
+    avg_intensity = float(intensities[used] @ quantities[used]) / total_amount
+    simplified_ratio = format_ratio(simplify_ratio(used_quantities, places=2))
+
+    if compact:
+        result = {
+            "indices": used.tolist(),
+            "quantities": used_quantities,
+            "simplified_ratio": simplified_ratio,
+            "average_intensity": round(avg_intensity, 2),
+            "total_amount": total_amount,
+            "total_cost": total_cost
+        }
+        if ids is not None:
+            result["ids"] = np.asarray(ids)[used].tolist()
+        return result
+
+    quantities_formatted = [f"{q:.2f}" for q in used_quantities]
+
+    component_results = []
+    for position, i in enumerate(used.tolist()):
+        component_results.append({
+            'index': i,
+            'name': names[i],
+            'intensity': float(intensities[i]),
+            'unit_cost': float(unit_costs[i]),
+            'quantity': used_quantities[position],
+            'quantity_formatted': quantities_formatted[position],
+            'cost': used_quantities[position] * float(unit_costs[i]),
+            'percentage': (used_quantities[position] / total_amount) * 100
+        })
+        if ids is not None:
+            component_results[-1]['id'] = int(ids[i])
+
+    return {
+        "components": component_results,
+        "quantities": used_quantities,
+        "quantities_formatted": quantities_formatted,
+        "simplified_ratio": simplified_ratio,
+        "average_intensity": round(avg_intensity, 2),
+        "total_amount": total_amount,
+        "total_cost": total_cost
+    }
+
+@optimize_bp.route("/optimize", methods=["POST"])
+def optimize_mix():
+    data = request.get_json(silent=True)
+
+    try:
+        values = OPTIMIZE_SCHEMA(data)
+        names, intensities, unit_costs, stock, ids = _parse_lots(data)
+    except SchemaError as e:
+        return jsonify({"error": str(e)}), 400
+    except KeyError as e:
+        return jsonify({"error": f"Nedostaje polje {e}"}), 400
+    except (TypeError, ValueError):
+        return jsonify({"error": "Molimo unesite ispravne numeričke vrijednosti"}), 400
+
+    result = calculate_optimal_mix(
+        names, intensities, unit_costs, stock, values["total_amount"], values["desired_intensity"], ids,
+        compact=compact_requested()
+    )
+    return respond(result)
@@ -1,24 +1,41 @@
+import numpy as np
 from flask import Blueprint, request, jsonify
 
+from services.api import cached_get, canonical_number, compact_requested, respond
+from services.metrics import stage
+from services.ratio import format_ratio, reduce_integers
+from services.schema import SchemaError, compile_schema, number
+
 simple_bp = Blueprint('simple_mix', __name__)
 
-# Najveći zajednički djelitelj
-def gcd(a, b):
-    return int(b == 0 and a or gcd(b, a % b))
+# Najveći broj redaka u jednom batch zahtjevu
+MAX_BATCH_ROWS = 1_000_000
 
-@simple_bp.route("/simple", methods=["POST"])
-def simple_mix():
-    data = request.json
-    try:
-        a1 = float(data["a1"])
-        a2 = float(data["a2"])
-        m = float(data["m"])
-        S = float(data["S"])
+BATCH_FIELDS = ("a1", "a2", "m", "S")
+
+# Tipovi vrijednosti stupca koje se mogu izravno pretvoriti u float64
+NUMERIC_TYPES = frozenset((int, float))
+
+# Ulaz jednostavne smjese; provjerava se prije izračuna
+SIMPLE_SCHEMA = compile_schema({field: number() for field in BATCH_FIELDS})
+
+def calculate_simple_mix(data, compact=False):
+    """Izračun jednostavne smjese za jedan zahtjev; greške se vraćaju pod ključem 'error'
+
+    U sažetom obliku (compact) izostavljaju se formatirane količine.
+    """
+    with stage("validate"):
+        try:
+            values = SIMPLE_SCHEMA(data)
+        except SchemaError as e:
+            return {"error": str(e)}
+        a1, a2, m, S = values["a1"], values["a2"], values["m"], values["S"]
 
         # Validacija: m mora biti između a1 i a2
         if not (min(a1, a2) < m < max(a1, a2)):
-            return jsonify({"error": "m mora biti između a1 i a2"}), 400
+            return {"error": "m mora biti između a1 i a2"}
 
+    with stage("solve"):
         # Omjer komponenti
         x1_ratio = a2 - m
         x2_ratio = m - a1
@@ -30,41 +47,221 @@ def simple_mix():
         x1 = x1_ratio * k
         x2 = x2_ratio * k
 
+    # Provjera valjanosti
+    if not (0 < x1 < float('inf') and 0 < x2 < float('inf')):
+        return {"error": "Izračunate vrijednosti nisu valjane. Provjerite ulazne podatke."}
+
+    # Provjera ukupne količine
+    ukupno = x1 + x2
+    tolerancija = 0.001
+
+    if abs(ukupno - S) > tolerancija:
+        return {
+            "error": f"Račun nije konzistentan: izračunato {ukupno:.4f}, a očekivano {S}"
+        }
+
+    # Skraćeni omjer
+    with stage("simplify"):
+        simplified_ratio = format_ratio(reduce_integers([round(x1), round(x2)]))
+
+    if compact:
+        return {"quantities": [x1, x2], "simplified_ratio": simplified_ratio}
+
+    # Odgovor s formatiranim količinama (2 decimale)
+    return {
+        "quantities": [x1, x2],
+        "quantities_formatted": [f"{round(x1, 2):.2f}", f"{round(x2, 2):.2f}"],
+        "simplified_ratio": simplified_ratio,
+    }
+
+@simple_bp.route("/simple", methods=["POST"])
+def simple_mix():
+    result = calculate_simple_mix(request.get_json(silent=True), compact=compact_requested())
+    return respond(result)
+
+@simple_bp.route("/simple", methods=["GET"])
+def simple_mix_get():
+    """Kanonski GET oblik /simple?a1=..&a2=..&m=..&S=.. koji se može spremiti u cache"""
+    try:
+        values = SIMPLE_SCHEMA(request.args.to_dict())
+    except SchemaError as e:
+        return respond({"error": str(e)})
+    params = [(field, canonical_number(values[field])) for field in BATCH_FIELDS]
+    return cached_get(params, lambda: calculate_simple_mix(values, compact=compact_requested()))
+
+def _parse_column(values):
+    """Pretvara listu vrijednosti u float64 polje; vraća (stupac, maska neispravnih ili None)
+
+    Ispravni su isti brojevi kao u number(): konačni int, float i numerički
+    stringovi. Neispravne vrijednosti (null, true/false, NaN, beskonačno)
+    postaju NaN i označene su u maski.
+    """
+    if NUMERIC_TYPES.issuperset(map(type, values)):
+        try:
+            column = np.asarray(values, dtype=np.float64)
+        except OverflowError:
+            # Cijeli broj izvan raspona float64
+            column = None
+        if column is not None:
+            invalid = ~np.isfinite(column)
+            return column, invalid if invalid.any() else None
+
+    column = np.empty(len(values), dtype=np.float64)
+    for i, value in enumerate(values):
+        value_type = type(value)
+        try:
+            column[i] = float(value) if value_type is float or value_type is int or value_type is str else np.nan
+        except (OverflowError, ValueError):
+            column[i] = np.nan
+    invalid = ~np.isfinite(column)
+    column[invalid] = np.nan
+    return column, invalid
+
+def _batch_columns(data):
+    """Vraća stupce a1, a2, m, S iz stupčanog ili retčanog oblika zahtjeva"""
+    if not isinstance(data, dict):
+        raise ValueError("Tijelo zahtjeva mora biti JSON objekt")
+
+    if "rows" in data:
+        rows = data["rows"]
+        if not isinstance(rows, list):
+            raise ValueError("Polje 'rows' mora biti lista")
+        columns = {field: [] for field in BATCH_FIELDS}
+        for row in rows:
+            if isinstance(row, dict):
+                values = [row.get(field) for field in BATCH_FIELDS]
+            elif isinstance(row, (list, tuple)) and len(row) == len(BATCH_FIELDS):
+                values = row
+            else:
+                values = [None] * len(BATCH_FIELDS)
+            for field, value in zip(BATCH_FIELDS, values):
+                columns[field].append(value)
+        return columns
+
+    columns = {}
+    for field in BATCH_FIELDS:
+        if not isinstance(data.get(field), list):
+            raise ValueError(f"Polje '{field}' mora biti lista")
+        columns[field] = data[field]
+
+    lengths = {len(column) for column in columns.values()}
+    if len(lengths) != 1:
+        raise ValueError("Svi stupci moraju imati jednak broj redaka")
+    return columns
+
+def simple_mix_batch(a1, a2, m, S, invalid=None):
+    """Vektorizirani izračun jednostavne smjese za cijela polja ulaza
+
+    Vraća polja količina x1, x2, skraćene omjere i listu grešaka po retku
+    (None za ispravne retke). Neispravni redovi ne prekidaju izračun ostalih.
+    """
+    n = len(a1)
+    errors = [None] * n
+    error_mask = np.zeros(n, dtype=bool)
+
+    def mark(mask, message):
+        # Bilježi samo prvu grešku za svaki redak
+        new = mask & ~error_mask
+        for i in np.flatnonzero(new):
+            errors[i] = message(i) if callable(message) else message
+        error_mask[new] = True
+
+    if invalid is not None:
+        mark(invalid, "Molimo unesite ispravne numeričke vrijednosti")
+
+    # Validacija: m mora biti između a1 i a2
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        in_range = (np.minimum(a1, a2) < m) & (m < np.maximum(a1, a2))
+        mark(~in_range, "m mora biti između a1 i a2")
+
+        # Omjer komponenti i faktor skaliranja
+        x1_ratio = a2 - m
+        x2_ratio = m - a1
+        k = S / (x1_ratio + x2_ratio)
+
+        # Količine
+        x1 = x1_ratio * k
+        x2 = x2_ratio * k
+
         # Provjera valjanosti
-        if any([
-            not isinstance(x1, float),
-            not isinstance(x2, float),
-            not (x1 > 0),
-            not (x2 > 0),
-            not (x1 < float('inf')),
-            not (x2 < float('inf'))
-        ]):
-            return jsonify({"error": "Izračunate vrijednosti nisu valjane. Provjerite ulazne podatke."}), 400
-
-        # Skraćeni omjer
-        x1_int = round(x1)
-        x2_int = round(x2)
-        divisor = gcd(x1_int, x2_int)
-        simplified_ratio = f"{x1_int // divisor} : {x2_int // divisor}"
-
-        # Formatirane količine (2 decimale)
-        quantities_formatted = [f"{round(x1, 2):.2f}", f"{round(x2, 2):.2f}"]
+        valid = (x1 > 0) & (x2 > 0) & (x1 < np.inf) & (x2 < np.inf)
+        mark(~valid, "Izračunate vrijednosti nisu valjane. Provjerite ulazne podatke.")
 
         # Provjera ukupne količine
         ukupno = x1 + x2
-        tolerancija = 0.001
-
-        if abs(ukupno - S) > tolerancija:
-            return jsonify({
-                "error": f"Račun nije konzistentan: izračunato {ukupno:.4f}, a očekivano {S}"
-            }), 400
-
-        # Odgovor
-        return jsonify({
-            "quantities": [x1, x2],
-            "quantities_formatted": quantities_formatted,
-            "simplified_ratio": simplified_ratio,
-        })
-
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
\ No newline at end of file
+        inconsistent = np.abs(ukupno - S) > 0.001
+        mark(inconsistent, lambda i: f"Račun nije konzistentan: izračunato {ukupno[i]:.4f}, a očekivano {S[i]}")
+
+    # Skraćeni omjer (samo za ispravne retke)
+    ok = ~error_mask
+    x1_int = np.zeros(n, dtype=np.int64)
+    x2_int = np.zeros(n, dtype=np.int64)
+    small = ok & (x1 < 2 ** 62) & (x2 < 2 ** 62)
+    x1_int[small] = np.rint(x1[small])
+    x2_int[small] = np.rint(x2[small])
+    divisor = np.gcd(x1_int, x2_int)
+    divisor[divisor == 0] = 1
+
+    simplified = [
+        f"{r1} : {r2}" if is_small else None
+        for r1, r2, is_small in zip((x1_int // divisor).tolist(), (x2_int // divisor).tolist(), small.tolist())
+    ]
+    # Vrlo velike količine izvan raspona int64 računaju se s Python cijelim brojevima
+    for i in np.flatnonzero(ok & ~small):
+        simplified[i] = format_ratio(reduce_integers([round(float(x1[i])), round(float(x2[i]))]))
+
+    return x1, x2, simplified, errors
+
+def calculate_simple_batch(columns, compact=False):
+    """Batch izračun iz stupaca a1, a2, m, S; greške pojedinih redaka vraćaju se u listi 'errors'"""
+    count = len(columns["a1"])
+    if count > MAX_BATCH_ROWS:
+        return {"error": f"Najveći dopušteni broj redaka je {MAX_BATCH_ROWS}"}
+
+    with stage("validate"):
+        parsed = {}
+        invalid = np.zeros(count, dtype=bool)
+        for field in BATCH_FIELDS:
+            parsed[field], field_invalid = _parse_column(columns[field])
+            if field_invalid is not None:
+                invalid |= field_invalid
+
+    with stage("solve"):
+        x1, x2, simplified, errors = simple_mix_batch(
+            parsed["a1"], parsed["a2"], parsed["m"], parsed["S"], invalid
+        )
+
+    x1_list = x1.tolist()
+    x2_list = x2.tolist()
+    quantities = [
+        None if error is not None else [q1, q2]
+        for q1, q2, error in zip(x1_list, x2_list, errors)
+    ]
+    result = {
+        "count": count,
+        "error_count": count - errors.count(None),
+        "quantities": quantities,
+        "simplified_ratio": simplified,
+        "errors": errors,
+    }
+    if compact:
+        return result
+
+    # Formatirane količine (2 decimale)
+    x1_rounded = np.round(x1, 2).tolist()
+    x2_rounded = np.round(x2, 2).tolist()
+    result["quantities_formatted"] = [
+        None if error is not None else [f"{q1:.2f}", f"{q2:.2f}"]
+        for q1, q2, error in zip(x1_rounded, x2_rounded, errors)
+    ]
+    return result
+
+@simple_bp.route("/simple/batch", methods=["POST"])
+def simple_mix_batch_route():
+    data = request.get_json(silent=True)
+    try:
+        columns = _batch_columns(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return respond(calculate_simple_batch(columns, compact=compact_requested()))
@@ -0,0 +1,117 @@
+import heapq
+from itertools import combinations, islice
+
+from services.ratio import simplify_ratio
+
+
+def _subsets(items, min_size, max_size):
+    """Podskupovi veličine od min_size do max_size, od manjih prema većima"""
+    for size in range(min_size, max_size + 1):
+        yield from combinations(items, size)
+
+def _remaining(items, used):
+    return tuple(item for item in items if item not in used)
+
+def enumerate_schemes(worse, better):
+    """Lijeno generira sve sheme sparivanja lošijih i boljih komponenti
+
+    Shema je skup parova (lošija, bolja) u kojem je svaka komponenta sparena
+    barem jednom i koji je minimalan - svaka komponenta sudjeluje u jednoj
+    "zvijezdi" (jedna komponenta sparena s jednom ili više s druge strane).
+    Za 2+2 to su dva 1-na-1 izbora, za 3+1 i 1+3 jedno rješenje.
+    Zvijezde se biraju tako da nakon njih ili nema preostalih komponenti ili
+    ih ima na obje strane, pa svaka grana rekurzije vodi do barem jednog
+    rješenja i prvo rješenje je dostupno nakon O(n) koraka, bez obzira na
+    ukupan broj kombinacija (npr. 1+k daje jedno rješenje bez prolaska kroz
+    2^k podskupova).
+    """
+    yield from _enumerate(tuple(worse), tuple(better), ())
+
+def _enumerate(worse, better, pairs):
+    if not worse and not better:
+        yield pairs
+        return
+
+    # Prva nesparena komponenta uvijek je lošija (komponente su sortirane)
+    first = worse[0]
+    rest_worse = worse[1:]
+
+    # Lošija komponenta je središte zvijezde s jednom ili više boljih; bez preostalih
+    # lošijih uzima sve bolje, inače mora ostaviti barem jednu
+    if rest_worse:
+        choices = _subsets(better, 1, len(better) - 1)
+    else:
+        choices = (better,)
+    for leaves in choices:
+        rest_better = _remaining(better, leaves)
+        yield from _enumerate(rest_worse, rest_better, pairs + tuple((first, leaf) for leaf in leaves))
+
+    # Lošija komponenta je list zvijezde čije je središte bolja komponenta s barem
+    # još jednim lošijim listom (zvijezda s jednim listom već je obuhvaćena gore)
+    for center in better:
+        rest_better = _remaining(better, (center,))
+        if rest_better:
+            choices = _subsets(rest_worse, 1, len(rest_worse) - 1)
+        else:
+            choices = (rest_worse,) if rest_worse else ()
+        for leaves in choices:
+            remaining_worse = _remaining(rest_worse, leaves)
+            star = ((first, center),) + tuple((leaf, center) for leaf in leaves)
+            yield from _enumerate(remaining_worse, rest_better, pairs + star)
+
+def scheme_ratios(pairs, intensities, desired_intensity):
+    """Omjeri za zadanu shemu: svaka komponenta dobiva zbroj razlika svojih parova"""
+    ratios = [0.0] * len(intensities)
+    for worse, better in pairs:
+        ratios[worse] += intensities[better] - desired_intensity
+        ratios[better] += desired_intensity - intensities[worse]
+    return ratios
+
+def iter_solutions(intensities, desired_intensity, max_schemes=None):
+    """Lijeno generira jedinstvena rješenja za proizvoljan broj komponenti
+
+    Komponente se sortiraju i dijele na lošije i bolje samo jednom. Rješenja
+    s istim vektorom omjera (npr. zbog jednakih intenziteta) vraćaju se jednom.
+    Omjeri i parovi vraćaju se u originalnom redoslijedu komponenti.
+    `max_schemes` ograničava broj pregledanih shema uključujući duplikate, pa
+    i skup viđenih omjera; jednaki intenziteti inače mogu dati eksponencijalno
+    mnogo shema s istim omjerom.
+    """
+    order = sorted(range(len(intensities)), key=lambda i: intensities[i])
+    worse = [i for i in order if intensities[i] < desired_intensity]
+    better = [i for i in order if intensities[i] > desired_intensity]
+    if len(worse) + len(better) != len(intensities) or not worse or not better:
+        return
+
+    seen = set()
+    for pairs in islice(enumerate_schemes(worse, better), max_schemes):
+        ratios = scheme_ratios(pairs, intensities, desired_intensity)
+        # Skraćeni cjelobrojni omjer prepoznaje duplikate neovisno o skali
+        key = tuple(simplify_ratio(ratios))
+        if key in seen:
+            continue
+        seen.add(key)
+        yield {"ratios": ratios, "pairs": sorted(pairs)}
+
+def _balanced(solution):
+    # Veći najmanji udio je bolji
+    return -min(solution["ratios"]) / sum(solution["ratios"])
+
+def _fewest_pairs(solution):
+    return len(solution["pairs"])
+
+CRITERIA = {
+    "balanced": _balanced,
+    "fewest_pairs": _fewest_pairs,
+}
+
+def solutions_page(intensities, desired_intensity, offset=0, limit=20, max_schemes=None):
+    """Vraća (rješenja, ima_još) za stranicu rješenja počevši od offseta"""
+    solutions = iter_solutions(intensities, desired_intensity, max_schemes)
+    page = list(islice(solutions, offset, offset + limit + 1))
+    return page[:limit], len(page) > limit
+
+def best_solutions(intensities, desired_intensity, criterion, limit=20, max_scan=10000):
+    """Vraća najboljih `limit` rješenja prema kriteriju među prvih `max_scan` shema"""
+    candidates = iter_solutions(intensities, desired_intensity, max_scan)
+    return heapq.nsmallest(limit, candidates, key=CRITERIA[criterion])
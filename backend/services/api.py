@@ -0,0 +1,120 @@
+import hashlib
+from urllib.parse import urlencode
+
+from flask import current_app, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson je neobavezan; bez njega se koristi standardni json
+    orjson = None
+
+# Medijski tip kojim klijent traži sažeti odgovor (alternativa za ?fields=compact)
+COMPACT_MEDIA_TYPE = "application/vnd.mix.compact+json"
+
+# Verzija formata rezultata; povećati kad se promijeni izračun ili oblik odgovora,
+# jer se GET odgovori dugo čuvaju u cacheovima preglednika i proxyja
+RESULT_VERSION = "1"
+
+# Trajanje GET odgovora u cacheu (rezultat ovisi samo o ulazu)
+CACHE_MAX_AGE = 365 * 24 * 3600
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider koji parsira i serijalizira s orjson kad je instaliran
+
+    Ključevi se ne sortiraju. Vrijednosti koje orjson ne podržava (npr.
+    cijeli brojevi izvan 64 bita) parsiraju se i serijaliziraju standardnim
+    putem, pa validacija polja javlja grešku za to polje.
+    """
+
+    def _orjson_options(self):
+        options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            try:
+                return orjson.dumps(obj, default=self.default, option=self._orjson_options()).decode("utf-8")
+            except orjson.JSONEncodeError:
+                pass
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                # Neispravan JSON ponovno odbija i standardni parser
+                pass
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        try:
+            body = orjson.dumps(obj, default=self.default, option=self._orjson_options() | orjson.OPT_APPEND_NEWLINE)
+        except orjson.JSONEncodeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+def _accepts_compact():
+    # Samo izričito navedeni tip; */* ne uključuje sažeti odgovor
+    return any(value == COMPACT_MEDIA_TYPE and quality > 0 for value, quality in request.accept_mimetypes)
+
+def compact_requested():
+    """Traži li klijent sažeti odgovor (?fields=compact ili Accept zaglavlje)"""
+    return request.args.get("fields") == "compact" or _accepts_compact()
+
+def respond(result):
+    """JSON odgovor za rezultat izračuna; greške vraćaju status 400
+
+    ?fields=a,b zadržava samo navedena polja najviše razine.
+    """
+    if "error" in result:
+        return jsonify(result), 400
+
+    fields = request.args.get("fields")
+    if fields and fields != "compact":
+        wanted = {field.strip() for field in fields.split(",")}
+        result = {key: value for key, value in result.items() if key in wanted}
+
+    response = jsonify(result)
+    if _accepts_compact():
+        response.mimetype = COMPACT_MEDIA_TYPE
+    response.vary.add("Accept")
+    return response
+
+def canonical_number(value):
+    """Kanonski zapis broja za ključ cachea; cijeli brojevi bez decimala kao u JavaScriptu"""
+    if value.is_integer() and abs(value) < 1e16:
+        return str(int(value))
+    return repr(value)
+
+def cached_get(params, compute):
+    """GET odgovor s jakim ETagom izvedenim iz normaliziranih parametara
+
+    `params` je lista (naziv, vrijednost) u kanonskom redoslijedu. ETag se
+    računa prije izračuna, pa If-None-Match s istim ETagom dobiva 304 bez
+    pozivanja `compute`. ETag uključuje i oblik odgovora (compact, fields).
+    """
+    key = urlencode(params)
+    variant = f"{RESULT_VERSION}|{key}|{compact_requested()}|{request.args.get('fields', '')}"
+    etag = hashlib.sha256(variant.encode("utf-8")).hexdigest()[:32]
+
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = respond(compute())
+        if isinstance(response, tuple):
+            # Greške se ne spremaju u cache
+            response[0].headers["Cache-Control"] = "no-store"
+            return response
+
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = f"public, max-age={CACHE_MAX_AGE}, immutable"
+    response.headers["Content-Location"] = f"{request.path}?{key}"
+    response.vary.add("Accept")
+    return response
@@ -0,0 +1,61 @@
+import os
+import threading
+from collections import OrderedDict
+
+# Registar svih cacheva radi administrativnog pregleda
+CACHES = {}
+
+class LRUCache:
+    """Thread-safe LRU cache ograničene veličine s brojačima pogodaka"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key, compute):
+        """Vraća vrijednost iz cachea ili je izračunava i sprema"""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+
+        # Izračun izvan lokota kako se paralelni zahtjevi ne bi blokirali
+        value = compute()
+        if self.maxsize <= 0:
+            return value
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+def register_cache(name, default_size=4096):
+    """Stvara imenovani cache; veličina se može zadati varijablom MIX_CACHE_SIZE"""
+    cache = LRUCache(int(os.environ.get("MIX_CACHE_SIZE", default_size)))
+    CACHES[name] = cache
+    return cache
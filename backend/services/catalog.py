@@ -0,0 +1,282 @@
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from services.filelock import file_lock
+
+logger = logging.getLogger(__name__)
+
+# Direktorij kataloga; svaka verzija je poddirektorij, a CURRENT pokazuje na aktivnu
+DEFAULT_CATALOG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "catalog")
+
+NUMERIC_FIELDS = ("ids", "intensity", "unit_cost", "stock")
+
+# Broj pokušaja učitavanja ako je verzija obrisana dok se CURRENT čitao
+LOAD_ATTEMPTS = 3
+
+class ComponentCatalog:
+    """Katalog komponenti sortiran po intenzitetu, spremljen kao memorijski mapirana polja
+
+    Svaka verzija kataloga sastoji se od .npy stupaca (ids, intensity,
+    unit_cost, stock), indeksa po ID-u (id_sorted, id_positions) te naziva
+    spremljenih kao UTF-8 bajtovi s pomacima. Učitavanje samo mapira datoteke,
+    pa ne ovisi o veličini kataloga. Izmjene se zapisuju kao nova verzija i
+    atomski aktiviraju zamjenom datoteke CURRENT; ostali procesi je učitaju
+    pri sljedećem pristupu.
+
+    Izmjene iz više procesa (gunicorn workeri) serijaliziraju se zaključavanjem
+    datoteke LOCK; svaka izmjena čita najnoviju verziju pod tim lokotom.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.RLock()
+        self._stamp = None
+        self.version = None
+        self._arrays = None
+
+    # Učitavanje
+
+    def _pointer(self):
+        return os.path.join(self.root, "CURRENT")
+
+    @contextmanager
+    def _write_lock(self):
+        """Lokot za izmjene unutar procesa i između procesa"""
+        with self._lock, file_lock(os.path.join(self.root, "LOCK")):
+            # Drugi proces je možda u međuvremenu aktivirao novu verziju
+            self._stamp = None
+            yield
+
+    def _refresh(self):
+        """Ponovno mapira katalog ako je druga verzija postala aktivna"""
+        try:
+            stat = os.stat(self._pointer())
+            # Svi CURRENT zapisi su iste duljine; inode se mijenja sa svakom zamjenom (os.replace)
+            stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            stamp = None
+        if stamp == self._stamp and self._arrays is not None:
+            return self._arrays
+
+        with self._lock:
+            if stamp is None:
+                self.version, self._arrays = None, _empty_arrays()
+            else:
+                for attempt in range(LOAD_ATTEMPTS):
+                    try:
+                        with open(self._pointer(), encoding="utf-8") as pointer:
+                            version = pointer.read().strip()
+                        arrays = _load_version(os.path.join(self.root, version))
+                        break
+                    except FileNotFoundError:
+                        # Između čitanja CURRENT i učitavanja dvije izmjene su obrisale tu verziju
+                        if attempt == LOAD_ATTEMPTS - 1:
+                            raise
+                        stamp = None
+                self.version, self._arrays = version, arrays
+            self._stamp = stamp
+        return self._arrays
+
+    def __len__(self):
+        return len(self._refresh()["ids"])
+
+    # Pretraživanje
+
+    def _record(self, arrays, position):
+        start, end = arrays["name_offsets"][position], arrays["name_offsets"][position + 1]
+        return {
+            "id": int(arrays["ids"][position]),
+            "name": bytes(arrays["names"][start:end]).decode("utf-8"),
+            "intensity": float(arrays["intensity"][position]),
+            "unit_cost": float(arrays["unit_cost"][position]),
+            # Neograničena zaliha vraća se kao None (JSON null)
+            "stock": float(arrays["stock"][position]) if np.isfinite(arrays["stock"][position]) else None,
+        }
+
+    def _position(self, arrays, component_id):
+        index = int(np.searchsorted(arrays["id_sorted"], component_id))
+        if index < len(arrays["id_sorted"]) and arrays["id_sorted"][index] == component_id:
+            return int(arrays["id_positions"][index])
+        return None
+
+    def get(self, component_id):
+        """Komponenta po ID-u u O(log n) ili None"""
+        arrays = self._refresh()
+        position = self._position(arrays, component_id)
+        return None if position is None else self._record(arrays, position)
+
+    def nearest(self, intensity, count=1):
+        """Do `count` komponenti neposredno ispod i iznad zadanog intenziteta"""
+        arrays = self._refresh()
+        lower = int(np.searchsorted(arrays["intensity"], intensity, side="left"))
+        upper = int(np.searchsorted(arrays["intensity"], intensity, side="right"))
+        return {
+            "below": [self._record(arrays, i) for i in range(lower - 1, max(lower - count, 0) - 1, -1)],
+            "equal": [self._record(arrays, i) for i in range(lower, min(upper, lower + count))],
+            "above": [self._record(arrays, i) for i in range(upper, min(upper + count, len(arrays["ids"])))],
+        }
+
+    def intensity_range(self, min_intensity=-np.inf, max_intensity=np.inf):
+        """Granice (start, end) komponenti s intenzitetom u zatvorenom intervalu"""
+        arrays = self._refresh()
+        start = int(np.searchsorted(arrays["intensity"], min_intensity, side="left"))
+        end = int(np.searchsorted(arrays["intensity"], max_intensity, side="right"))
+        return start, end
+
+    def records(self, start, end):
+        arrays = self._refresh()
+        return [self._record(arrays, i) for i in range(start, end)]
+
+    def columns(self, start=0, end=None):
+        """Stupci intenziteta, cijena i zaliha za raspon bez kopiranja"""
+        arrays = self._refresh()
+        return {field: arrays[field][start:end] for field in NUMERIC_FIELDS}
+
+    # Izmjene
+
+    def upsert(self, components):
+        """Dodaje ili zamjenjuje komponente; vraća ID-ove u redoslijedu ulaza
+
+        Komponente su već provjerene (routes/catalog.py COMPONENT_SCHEMA):
+        konačni brojevi i cjelobrojni ID-ovi, jer NaN intenzitet kvari
+        sortirani poredak na kojem rade nearest i intensity_range.
+        """
+        with self._write_lock():
+            current = _materialize(self._refresh())
+
+            next_id = int(current["ids"].max()) + 1 if len(current["ids"]) else 1
+            ids, names, intensity, unit_cost, stock = [], [], [], [], []
+            for component in components:
+                component_id = component.get("id")
+                if component_id is None:
+                    component_id, next_id = next_id, next_id + 1
+                ids.append(int(component_id))
+                next_id = max(next_id, int(component_id) + 1)
+                names.append(str(component.get("name") or f"Komponenta {component_id}"))
+                intensity.append(float(component["intensity"]))
+                unit_cost.append(float(component.get("unit_cost", 0.0)))
+                stock.append(float(component.get("stock", np.inf)))
+
+            if len(set(ids)) != len(ids):
+                raise ValueError("ID-ovi komponenti moraju biti jedinstveni")
+
+            keep = ~np.isin(current["ids"], ids)
+            self._write_locked({
+                "ids": np.concatenate([current["ids"][keep], np.asarray(ids, dtype=np.int64)]),
+                "intensity": np.concatenate([current["intensity"][keep], intensity]),
+                "unit_cost": np.concatenate([current["unit_cost"][keep], unit_cost]),
+                "stock": np.concatenate([current["stock"][keep], stock]),
+            }, [name for name, kept in zip(current["names"], keep) if kept] + names)
+            return ids
+
+    def delete(self, component_ids):
+        """Briše komponente; vraća broj obrisanih"""
+        with self._write_lock():
+            current = _materialize(self._refresh())
+            keep = ~np.isin(current["ids"], component_ids)
+            removed = int((~keep).sum())
+            if removed:
+                self._write_locked(
+                    {field: current[field][keep] for field in NUMERIC_FIELDS},
+                    [name for name, kept in zip(current["names"], keep) if kept]
+                )
+            return removed
+
+    def _write_locked(self, columns, names):
+        """Zapisuje novu verziju sortiranu po intenzitetu i aktivira je
+
+        Poziva se pod _write_lock, nakon što je self.version osvježen na
+        verziju na koju pokazuje CURRENT.
+        """
+        order = np.argsort(columns["intensity"], kind="stable")
+        columns = {field: np.ascontiguousarray(values[order]) for field, values in columns.items()}
+        names = [names[i] for i in order]
+
+        previous = self.version
+        version = f"v{time.time_ns()}"
+        path = os.path.join(self.root, version)
+        os.makedirs(path)
+
+        for field, values in columns.items():
+            np.save(os.path.join(path, f"{field}.npy"), values)
+        id_positions = np.argsort(columns["ids"], kind="stable")
+        np.save(os.path.join(path, "id_sorted.npy"), columns["ids"][id_positions])
+        np.save(os.path.join(path, "id_positions.npy"), id_positions)
+
+        encoded = [name.encode("utf-8") for name in names]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(name) for name in encoded], out=offsets[1:])
+        np.save(os.path.join(path, "name_offsets.npy"), offsets)
+        with open(os.path.join(path, "names.bin"), "wb") as names_file:
+            names_file.write(b"".join(encoded))
+
+        # Atomska zamjena pokazivača na aktivnu verziju
+        temporary = self._pointer() + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as pointer:
+            pointer.write(version)
+        os.replace(temporary, self._pointer())
+
+        # Prethodna verzija ostaje za procese koji je još učitavaju; brišu se samo starije
+        self._stamp = None
+        oldest_kept = _version_number(previous) if previous else _version_number(version)
+        for name in os.listdir(self.root):
+            number = _version_number(name)
+            if number is None or number >= oldest_kept:
+                continue
+            try:
+                shutil.rmtree(os.path.join(self.root, name))
+            except OSError:
+                # Npr. na Windowsu mapirane datoteke nije moguće odmah obrisati
+                logger.warning("Stara verzija kataloga %s nije obrisana", name, exc_info=True)
+
+def _version_number(name):
+    """Vremenska oznaka iz naziva verzije (v<ns>) ili None za ostale datoteke"""
+    if name.startswith("v") and name[1:].isdigit():
+        return int(name[1:])
+    return None
+
+def _empty_arrays():
+    return {
+        "ids": np.zeros(0, dtype=np.int64),
+        "intensity": np.zeros(0),
+        "unit_cost": np.zeros(0),
+        "stock": np.zeros(0),
+        "id_sorted": np.zeros(0, dtype=np.int64),
+        "id_positions": np.zeros(0, dtype=np.int64),
+        "name_offsets": np.zeros(1, dtype=np.int64),
+        "names": np.zeros(0, dtype=np.uint8),
+    }
+
+def _load_version(path):
+    arrays = {}
+    for field in NUMERIC_FIELDS + ("id_sorted", "id_positions", "name_offsets"):
+        arrays[field] = np.load(os.path.join(path, f"{field}.npy"), mmap_mode="r")
+    names_path = os.path.join(path, "names.bin")
+    if os.path.getsize(names_path):
+        arrays["names"] = np.memmap(names_path, dtype=np.uint8, mode="r")
+    else:
+        arrays["names"] = np.zeros(0, dtype=np.uint8)
+    return arrays
+
+def _materialize(arrays):
+    """Kopija kataloga u memoriji za izmjene"""
+    blob = bytes(arrays["names"])
+    offsets = arrays["name_offsets"].tolist()
+    columns = {field: np.array(arrays[field]) for field in NUMERIC_FIELDS}
+    columns["names"] = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+    return columns
+
+_catalog = None
+
+def get_catalog():
+    """Zajednički katalog procesa; direktorij se zadaje varijablom CATALOG_DIR"""
+    global _catalog
+    if _catalog is None:
+        _catalog = ComponentCatalog(os.environ.get("CATALOG_DIR", DEFAULT_CATALOG_DIR))
+    return _catalog
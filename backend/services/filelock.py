@@ -0,0 +1,52 @@
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows; zaključavanje prvog bajta datoteke preko msvcrt
+    fcntl = None
+    import msvcrt
+
+def _lock(lock_file, blocking):
+    if fcntl is not None:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    else:
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+
+def _unlock(lock_file):
+    if fcntl is not None:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    else:
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+@contextmanager
+def file_lock(path):
+    """Isključivi lokot između procesa na datoteci `path` za trajanje bloka"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a+b") as lock_file:
+        _lock(lock_file, blocking=True)
+        try:
+            yield
+        finally:
+            _unlock(lock_file)
+
+def try_lock(path):
+    """Pokušava uzeti lokot bez čekanja; vraća otvorenu datoteku koja ga drži ili None
+
+    Lokot se otpušta zatvaranjem datoteke ili završetkom procesa. Na POSIX-u
+    je to lockf, koji procesi stvoreni forkom ne nasljeđuju, pa lokot ne drže
+    procesi iz skupa koji nadžive svoj proces vlasnika.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    lock_file = open(path, "a+b")
+    try:
+        if fcntl is not None:
+            fcntl.lockf(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            _lock(lock_file, blocking=False)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
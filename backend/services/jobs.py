@@ -0,0 +1,395 @@
+import json
+import os
+import pickle
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+
+from services.filelock import file_lock, try_lock
+
+# Direktorij poslova zajednički svim workerima na računalu (MIX_JOB_DIR)
+DEFAULT_JOB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "jobs")
+
+# Broj procesa za pozadinske poslove; zadaje se varijablom MIX_JOB_WORKERS
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+# Najveći broj nedovršenih poslova prije odbijanja novih (MIX_JOB_QUEUE)
+DEFAULT_MAX_PENDING = 16
+
+# Koliko sekundi se čuva rezultat završenog posla (MIX_JOB_TTL)
+DEFAULT_TTL = 900
+
+# Preporučeno čekanje klijenta kad je red pun, u sekundama
+RETRY_AFTER = 5
+
+# Koliko često vlasnik skupa procesa traži nove i otkazane poslove, u sekundama
+POLL_INTERVAL = 0.2
+
+class JobQueueFull(Exception):
+    """Red poslova je pun; klijent treba pokušati kasnije"""
+
+def _write_atomic(path, data):
+    """Zapisuje datoteku tako da je drugi procesi vide cijelu ili je ne vide"""
+    temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporary, "wb") as output:
+        output.write(data)
+    os.replace(temporary, path)
+
+def _create_once(path, data):
+    """Stvara datoteku samo ako ne postoji; vraća je li ovaj poziv stvorio datoteku"""
+    try:
+        descriptor = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return False
+    with os.fdopen(descriptor, "wb") as output:
+        output.write(data)
+    return True
+
+def _load(path):
+    with open(path, "rb") as source:
+        return pickle.load(source)
+
+def _exit_with_owner(owner_pid):
+    """Proces iz skupa završava kad mu proces vlasnik nestane; dijelove preuzima novi vlasnik"""
+    def watch():
+        while os.getppid() == owner_pid:
+            time.sleep(1)
+        os._exit(0)
+    threading.Thread(target=watch, daemon=True).start()
+
+def _run_chunk(function, job_dir, index):
+    """Izvodi dio posla u procesu iz skupa; rezultat zapisuje u direktorij posla"""
+    _create_once(os.path.join(job_dir, "started"), b"")
+    result = function(*_load(os.path.join(job_dir, f"input-{index}.pickle")))
+    if isinstance(result, dict) and "error" in result:
+        return result
+    _write_atomic(os.path.join(job_dir, f"result-{index}.pickle"), pickle.dumps(result, pickle.HIGHEST_PROTOCOL))
+    return None
+
+class JobManager:
+    """Red poslova nad jednim skupom procesa po računalu, bez vanjskog brokera
+
+    Stanje posla su datoteke u direktoriju posla koje se zapisuju jednom
+    (ulazi i rezultati dijelova, oznake started/finished/cancelled, greška),
+    pa svaki gunicorn worker vidi iste poslove. Skup procesa ima samo
+    worker koji drži lokot POOL.lock; njegova dretva pokreće dijelove bez
+    rezultata. Ako taj worker završi, sljedeći poziv API-ja u drugom workeru
+    preuzima lokot i nastavlja nedovršene dijelove.
+    """
+
+    def __init__(self, root, workers, max_pending, ttl):
+        self.root = root
+        self.workers = workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._owner_lock = None
+        self._executor = None
+        self._futures = {}
+        self._wake = threading.Event()
+
+    # Vlasništvo skupa procesa
+
+    def _ensure_owner(self):
+        """Preuzima skup procesa ako ga nijedan proces na računalu trenutno nema"""
+        with self._lock:
+            if self._owner_lock is not None:
+                return True
+            self._owner_lock = try_lock(os.path.join(self.root, "POOL.lock"))
+            if self._owner_lock is None:
+                return False
+        threading.Thread(target=self._dispatch_loop, name="job-dispatcher", daemon=True).start()
+        return True
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_exit_with_owner, initargs=(os.getpid(),)
+            )
+        return self._executor
+
+    def _dispatch_loop(self):
+        while True:
+            self._wake.wait(POLL_INTERVAL)
+            self._wake.clear()
+            try:
+                self._dispatch()
+            except OSError:
+                # Npr. posao obrisan istekom dok se čitao; sljedeći prolaz ponavlja pregled
+                pass
+
+    def _dispatch(self):
+        """Pokreće dijelove novih i preuzetih poslova, otkazuje otkazane"""
+        for job_id in self._job_ids():
+            job_dir = os.path.join(self.root, job_id)
+            status = _status(job_dir)
+            with self._lock:
+                futures = self._futures.get(job_id)
+                if futures is not None:
+                    if status in ("cancelled", "failed"):
+                        for future in futures:
+                            future.cancel()
+                    if status not in ("queued", "running"):
+                        del self._futures[job_id]
+                    continue
+                if status not in ("queued", "running"):
+                    continue
+
+                meta = _meta(job_dir)
+                function = _load(os.path.join(job_dir, "spec.pickle"))["function"]
+                futures = self._futures[job_id] = []
+                for index in range(len(meta["sizes"])):
+                    if os.path.exists(os.path.join(job_dir, f"result-{index}.pickle")):
+                        continue
+                    try:
+                        future = self._pool().submit(_run_chunk, function, job_dir, index)
+                    except BrokenProcessPool:
+                        # Proces je nasilno prekinut; novi skup procesa za sljedeće dijelove
+                        self._executor = None
+                        future = self._pool().submit(_run_chunk, function, job_dir, index)
+                    futures.append(future)
+            for future in list(futures):
+                future.add_done_callback(lambda future, job_dir=job_dir: self._chunk_done(job_dir, future))
+        self._purge()
+
+    def _chunk_done(self, job_dir, future):
+        try:
+            outcome = future.result()
+        except CancelledError:
+            return
+        except BrokenProcessPool:
+            with self._lock:
+                self._executor = None
+            outcome = {"error": "Proces izračuna je neočekivano prekinut"}
+        except Exception as e:
+            outcome = {"error": str(e)}
+
+        try:
+            if outcome is not None:
+                _create_once(os.path.join(job_dir, "error.json"), json.dumps(
+                    {"error": outcome["error"], "finished": time.time()}
+                ).encode("utf-8"))
+                self._wake.set()
+            elif _completed(job_dir, _meta(job_dir)) == len(_meta(job_dir)["sizes"]):
+                _create_once(os.path.join(job_dir, "finished"), str(time.time()).encode("utf-8"))
+        except FileNotFoundError:
+            # Posao je u međuvremenu istekao i obrisan
+            pass
+
+    # Zajednički direktorij poslova
+
+    def _job_ids(self):
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return []
+        return [name for name in names if not name.startswith(".") and os.path.isdir(os.path.join(self.root, name))]
+
+    def _purge(self):
+        """Briše poslove kojima je istekao rok čuvanja rezultata"""
+        now = time.time()
+        for job_id in self._job_ids():
+            job_dir = os.path.join(self.root, job_id)
+            finished = _finished(job_dir)
+            if finished is not None and now - finished > self.ttl:
+                try:
+                    shutil.rmtree(job_dir)
+                except FileNotFoundError:
+                    # Drugi proces ga je već obrisao
+                    pass
+
+    def pending(self):
+        return sum(1 for job_id in self._job_ids() if _status(os.path.join(self.root, job_id)) in ("queued", "running"))
+
+    def submit(self, kind, chunks, merge):
+        """Sprema posao u zajednički direktorij i vraća njegov ID
+
+        Chunks su rječnici s funkcijom, argumentima, pomakom i veličinom;
+        funkcije moraju biti definirane na razini modula jer se serijaliziraju.
+        """
+        job_id = uuid.uuid4().hex
+        os.makedirs(self.root, exist_ok=True)
+        staging = os.path.join(self.root, f".tmp-{job_id}")
+        os.makedirs(staging)
+        try:
+            for index, chunk in enumerate(chunks):
+                with open(os.path.join(staging, f"input-{index}.pickle"), "wb") as output:
+                    pickle.dump(chunk["args"], output, pickle.HIGHEST_PROTOCOL)
+            with open(os.path.join(staging, "spec.pickle"), "wb") as output:
+                pickle.dump({"function": chunks[0]["function"], "merge": merge}, output, pickle.HIGHEST_PROTOCOL)
+            with open(os.path.join(staging, "job.json"), "w", encoding="utf-8") as output:
+                json.dump({
+                    "id": job_id,
+                    "kind": kind,
+                    "created": time.time(),
+                    "offsets": [chunk["offset"] for chunk in chunks],
+                    "sizes": [chunk["size"] for chunk in chunks],
+                }, output)
+
+            with file_lock(os.path.join(self.root, "LOCK")):
+                self._purge()
+                if self.pending() >= self.max_pending:
+                    raise JobQueueFull(f"Red poslova je pun ({self.max_pending} nedovršenih poslova)")
+                # Posao postaje vidljiv drugim procesima tek kad je potpun
+                os.rename(staging, os.path.join(self.root, job_id))
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        if self._ensure_owner():
+            self._wake.set()
+        return job_id
+
+    def cancel(self, job_id):
+        """Otkazuje posao; dijelovi koji se već izvode završavaju, ali se rezultat odbacuje"""
+        self._ensure_owner()
+        job_dir = self._job_dir(job_id)
+        if job_dir is None:
+            return None
+        if _status(job_dir) in ("queued", "running"):
+            _create_once(os.path.join(job_dir, "cancelled"), str(time.time()).encode("utf-8"))
+            self._wake.set()
+        return self._snapshot(job_dir, partial=False)
+
+    def snapshot(self, job_id, partial=False):
+        """Stanje posla za API ili None ako posao ne postoji ili je istekao"""
+        self._ensure_owner()
+        job_dir = self._job_dir(job_id)
+        if job_dir is None:
+            return None
+        return self._snapshot(job_dir, partial)
+
+    def list(self):
+        self._ensure_owner()
+        snapshots = []
+        for job_id in self._job_ids():
+            try:
+                snapshots.append(self._snapshot(os.path.join(self.root, job_id), partial=False, include_result=False))
+            except FileNotFoundError:
+                continue
+        return sorted(snapshots, key=lambda snapshot: snapshot["created_at"])
+
+    def _job_dir(self, job_id):
+        if not job_id.isalnum():
+            return None
+        job_dir = os.path.join(self.root, job_id)
+        finished = _finished(job_dir) if os.path.isdir(job_dir) else None
+        if not os.path.isdir(job_dir) or (finished is not None and time.time() - finished > self.ttl):
+            return None
+        return job_dir
+
+    def _snapshot(self, job_dir, partial, include_result=True):
+        meta = _meta(job_dir)
+        status = _status(job_dir)
+        sizes, offsets = meta["sizes"], meta["offsets"]
+        done = [True] * len(sizes) if status == "done" else [
+            os.path.exists(os.path.join(job_dir, f"result-{index}.pickle")) for index in range(len(sizes))
+        ]
+        completed_items = sum(size for size, finished in zip(sizes, done) if finished)
+        total_items = sum(sizes)
+        finished = _finished(job_dir)
+        snapshot = {
+            "id": meta["id"],
+            "type": meta["kind"],
+            "status": status,
+            "created_at": _timestamp(meta["created"]),
+            "finished_at": _timestamp(finished),
+            "expires_at": _timestamp(finished + self.ttl if finished is not None else None),
+            "progress": {
+                "completed_chunks": sum(done),
+                "total_chunks": len(sizes),
+                "completed_items": completed_items,
+                "total_items": total_items,
+                "percent": round(100 * completed_items / total_items, 1) if total_items else 100.0,
+            },
+        }
+        if status == "failed":
+            with open(os.path.join(job_dir, "error.json"), encoding="utf-8") as source:
+                snapshot["error"] = json.load(source)["error"]
+        if status == "done" and include_result:
+            snapshot["result"] = _merged_result(job_dir, len(sizes))
+        elif status == "running" and partial:
+            snapshot["partial"] = [
+                {"offset": offset, "count": size, "result": _load(os.path.join(job_dir, f"result-{index}.pickle"))}
+                for index, (offset, size, finished) in enumerate(zip(offsets, sizes, done))
+                if finished
+            ]
+        return snapshot
+
+def _meta(job_dir):
+    with open(os.path.join(job_dir, "job.json"), encoding="utf-8") as source:
+        return json.load(source)
+
+def _completed(job_dir, meta):
+    return sum(
+        os.path.exists(os.path.join(job_dir, f"result-{index}.pickle")) for index in range(len(meta["sizes"]))
+    )
+
+def _status(job_dir):
+    """Stanje posla iz oznaka u direktoriju; otkazivanje i greška imaju prednost"""
+    if os.path.exists(os.path.join(job_dir, "cancelled")):
+        return "cancelled"
+    if os.path.exists(os.path.join(job_dir, "error.json")):
+        return "failed"
+    if os.path.exists(os.path.join(job_dir, "finished")):
+        return "done"
+    if os.path.exists(os.path.join(job_dir, "started")):
+        return "running"
+    return "queued"
+
+def _finished(job_dir):
+    """Vrijeme završetka (uspjeh, greška ili otkazivanje) ili None"""
+    for name in ("finished", "cancelled"):
+        try:
+            with open(os.path.join(job_dir, name), encoding="utf-8") as source:
+                return float(source.read())
+        except (FileNotFoundError, ValueError):
+            continue
+    try:
+        with open(os.path.join(job_dir, "error.json"), encoding="utf-8") as source:
+            return json.load(source)["finished"]
+    except (FileNotFoundError, ValueError):
+        return None
+
+def _merged_result(job_dir, count):
+    """Dijelovi se spajaju jednom, pri prvom dohvatu rezultata, i spremaju u merged.pickle"""
+    merged_path = os.path.join(job_dir, "merged.pickle")
+    if os.path.exists(merged_path):
+        return _load(merged_path)
+    try:
+        merge = _load(os.path.join(job_dir, "spec.pickle"))["merge"]
+        result = merge([_load(os.path.join(job_dir, f"result-{index}.pickle")) for index in range(count)])
+    except FileNotFoundError:
+        # Drugi proces je upravo spojio dijelove i obrisao ih
+        return _load(merged_path)
+    _write_atomic(merged_path, pickle.dumps(result, pickle.HIGHEST_PROTOCOL))
+    for index in range(count):
+        for name in (f"result-{index}.pickle", f"input-{index}.pickle"):
+            try:
+                os.remove(os.path.join(job_dir, name))
+            except FileNotFoundError:
+                pass
+    return result
+
+def _timestamp(seconds):
+    if seconds is None:
+        return None
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat()
+
+_manager = None
+
+def get_job_manager():
+    """Red poslova zajednički svim procesima koji koriste isti MIX_JOB_DIR"""
+    global _manager
+    if _manager is None:
+        _manager = JobManager(
+            os.environ.get("MIX_JOB_DIR", DEFAULT_JOB_DIR),
+            int(os.environ.get("MIX_JOB_WORKERS", DEFAULT_WORKERS)),
+            int(os.environ.get("MIX_JOB_QUEUE", DEFAULT_MAX_PENDING)),
+            float(os.environ.get("MIX_JOB_TTL", DEFAULT_TTL)),
+        )
+    return _manager
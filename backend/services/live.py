@@ -0,0 +1,164 @@
+import os
+import threading
+import time
+import uuid
+
+# Najveći broj istodobnih sesija po procesu (MIX_LIVE_SESSIONS)
+DEFAULT_MAX_SESSIONS = 1000
+
+# Koliko sekundi se čuva sesija bez otvorenog toka i bez izmjena (MIX_LIVE_TTL)
+DEFAULT_TTL = 600
+
+# Ulaz mora mirovati ovoliko sekundi prije izračuna, pa se nalet izmjena računa jednom
+DEBOUNCE = 0.05
+
+# Najdulje odgađanje izračuna dok izmjene stalno stižu
+MAX_DELAY = 0.5
+
+# Razmak komentara koji održavaju vezu otvorenom kroz proxyje, u sekundama
+HEARTBEAT = 15
+
+# Preporučeno čekanje klijenta kad nema mjesta za novu sesiju, u sekundama
+RETRY_AFTER = 5
+
+class LiveSessionLimit(Exception):
+    """Dosegnut je najveći broj sesija; klijent treba pokušati kasnije"""
+
+class LiveSession:
+    """Ulaz interaktivnog izračuna i posljednji rezultat
+
+    Svaka izmjena povećava verziju i budi tokove koji čekaju na uvjetu;
+    rezultat se računa samo za najnoviju verziju i dijeli među tokovima.
+    """
+
+    def __init__(self, kind, compute, state):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.compute = compute
+        self.state = state
+        self.version = 1
+        self.changed = time.monotonic()
+        self.last_seen = time.monotonic()
+        self.streams = 0
+        self.closed = False
+        self.result = None
+        self.result_version = 0
+        self.condition = threading.Condition()
+
+    def update(self, patch):
+        """Spaja izmjenu u ulaz; verzija raste samo ako se ulaz promijenio"""
+        with self.condition:
+            state = {**self.state, **patch}
+            self.last_seen = time.monotonic()
+            if state != self.state:
+                self.state = state
+                self.version += 1
+                self.changed = self.last_seen
+                self.condition.notify_all()
+            return self.version
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def _wait_for_change(self, sent_version):
+        """Čeka novu verziju i zatim da ulaz miruje DEBOUNCE sekundi (najviše MAX_DELAY)
+
+        Vraća (stanje, verziju), None nakon HEARTBEAT sekundi bez izmjena ili
+        False kad je sesija zatvorena.
+        """
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.closed or self.version != sent_version, HEARTBEAT):
+                return None
+            first_seen = time.monotonic()
+            while not self.closed:
+                quiet = DEBOUNCE - (time.monotonic() - self.changed)
+                late = MAX_DELAY - (time.monotonic() - first_seen)
+                if quiet <= 0 or late <= 0:
+                    break
+                self.condition.wait(min(quiet, late))
+            if self.closed:
+                return False
+            return self.state, self.version
+
+    def _result(self, state, version):
+        # Više tokova iste sesije dijeli rezultat iste verzije
+        if self.result_version != version:
+            self.result = self.compute(state)
+            self.result_version = version
+        return self.result
+
+    def events(self, sent_version=0):
+        """Generator (verzija, rezultat) za svaku novu verziju ulaza; None za heartbeat"""
+        with self.condition:
+            self.streams += 1
+        try:
+            while True:
+                change = self._wait_for_change(sent_version)
+                if change is False:
+                    return
+                if change is None:
+                    yield None
+                    continue
+                state, sent_version = change
+                yield sent_version, self._result(state, sent_version)
+        finally:
+            with self.condition:
+                self.streams -= 1
+                self.last_seen = time.monotonic()
+
+class LiveSessionManager:
+    """Sesije u memoriji procesa; tokovi istog klijenta moraju stizati na isti proces"""
+
+    def __init__(self, max_sessions, ttl):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _purge_locked(self):
+        """Briše sesije bez otvorenog toka koje dulje od TTL-a nisu mijenjane"""
+        now = time.monotonic()
+        expired = [
+            session_id for session_id, session in self._sessions.items()
+            if session.streams == 0 and now - session.last_seen > self.ttl
+        ]
+        for session_id in expired:
+            self._sessions.pop(session_id).close()
+
+    def create(self, kind, compute, state):
+        with self._lock:
+            self._purge_locked()
+            if len(self._sessions) >= self.max_sessions:
+                raise LiveSessionLimit(f"Dosegnut je najveći broj sesija ({self.max_sessions})")
+            session = LiveSession(kind, compute, state)
+            self._sessions[session.id] = session
+            return session
+
+    def get(self, session_id):
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def close(self, session_id):
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is not None:
+            session.close()
+        return session
+
+    def count(self):
+        with self._lock:
+            return len(self._sessions)
+
+_manager = None
+
+def get_session_manager():
+    """Zajedničke sesije procesa"""
+    global _manager
+    if _manager is None:
+        _manager = LiveSessionManager(
+            int(os.environ.get("MIX_LIVE_SESSIONS", DEFAULT_MAX_SESSIONS)),
+            float(os.environ.get("MIX_LIVE_TTL", DEFAULT_TTL)),
+        )
+    return _manager
@@ -0,0 +1,227 @@
+import bisect
+import cProfile
+import os
+import random
+import re
+import threading
+import time
+
+# Granice histograma trajanja zahtjeva, u sekundama
+REQUEST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Granice histograma faza izračuna; faze su puno kraće od cijelog zahtjeva
+STAGE_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05, 0.25, 1.0)
+
+# Direktorij za cProfile ispise (MIX_PROFILE_DIR)
+DEFAULT_PROFILE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "profiles")
+
+# Najveći udio profiliranih zahtjeva; svaki profilirani zahtjev zapisuje datoteku
+MAX_SAMPLE_RATE = 0.1
+
+# Koliko najnovijih .prof datoteka se čuva (MIX_PROFILE_MAX_FILES); starije se brišu
+DEFAULT_PROFILE_MAX_FILES = 200
+
+class Counter:
+    """Brojač s oznakama"""
+
+    def __init__(self, name, help_text, labels):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labels, label_values)} {value}")
+        return lines
+
+class Histogram:
+    """Histogram s fiksnim granicama; kumulativni zbrojevi računaju se pri ispisu"""
+
+    def __init__(self, name, help_text, labels, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(label_values)
+            if series is None:
+                series = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(
+                        f"{self.name}_bucket{_labels(self.labels + ('le',), label_values + (le,))} {cumulative}"
+                    )
+                lines.append(f"{self.name}_sum{_labels(self.labels, label_values)} {total}")
+                lines.append(f"{self.name}_count{_labels(self.labels, label_values)} {count}")
+        return lines
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+REQUESTS = Counter("mix_http_requests_total", "Broj HTTP zahtjeva", ("route", "method", "status"))
+REQUEST_DURATION = Histogram(
+    "mix_http_request_duration_seconds", "Trajanje HTTP zahtjeva", ("route", "method"), REQUEST_BUCKETS
+)
+ERRORS = Counter("mix_http_errors_total", "Broj neuspješnih zahtjeva po vrsti greške", ("route", "type"))
+STAGE_DURATION = Histogram(
+    "mix_stage_duration_seconds", "Trajanje faza izračuna bez ugniježđenih faza", ("route", "stage"), STAGE_BUCKETS
+)
+
+METRICS = [REQUESTS, REQUEST_DURATION, ERRORS, STAGE_DURATION]
+
+# Vrsta greške prema statusu odgovora; iznimke se bilježe imenom klase
+ERROR_TYPES = {
+    400: "validation",
+    404: "not_found",
+    405: "method_not_allowed",
+    413: "payload_too_large",
+    415: "unsupported_media_type",
+    429: "queue_full",
+}
+
+_local = threading.local()
+
+def begin_request(route):
+    """Označava početak zahtjeva u trenutnoj dretvi; faze se bilježe pod ovom rutom"""
+    _local.route = route
+    _local.stack = []
+
+def end_request():
+    _local.route = None
+    _local.stack = []
+
+class stage:
+    """Mjeri fazu izračuna (parse, validate, solve, simplify, serialize)
+
+    Vrijeme ugniježđenih faza oduzima se od vanjske, pa je npr. skraćivanje
+    omjera unutar rješavanja vidljivo kao zasebna faza. Izvan zahtjeva
+    (pozadinski poslovi) ne bilježi ništa.
+    """
+
+    __slots__ = ("name", "frame")
+
+    def __init__(self, name):
+        self.name = name
+        self.frame = None
+
+    def __enter__(self):
+        if getattr(_local, "route", None) is not None:
+            self.frame = [time.perf_counter(), 0.0]
+            _local.stack.append(self.frame)
+        return self
+
+    def __exit__(self, *exc_info):
+        frame = self.frame
+        if frame is None:
+            return False
+        elapsed = time.perf_counter() - frame[0]
+        stack = _local.stack
+        if stack and stack[-1] is frame:
+            stack.pop()
+            if stack:
+                stack[-1][1] += elapsed
+        STAGE_DURATION.observe(max(elapsed - frame[1], 0.0), _local.route, self.name)
+        return False
+
+def record_request(route, method, status, duration, error_type=None):
+    REQUESTS.inc(route, method, str(status))
+    REQUEST_DURATION.observe(duration, route, method)
+    if error_type is None and status >= 400:
+        error_type = ERROR_TYPES.get(status, "client_error" if status < 500 else "server_error")
+    if error_type is not None:
+        ERRORS.inc(route, error_type)
+
+def render_metrics(extra_lines=()):
+    """Sve metrike u Prometheus tekstualnom formatu"""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    lines.extend(extra_lines)
+    return "\n".join(lines) + "\n"
+
+class SamplingProfiler:
+    """cProfile za nasumični udio zahtjeva; ispisi se spremaju kao .prof datoteke
+
+    Udio se zadaje varijablom MIX_PROFILE_SAMPLE_RATE (0 isključuje
+    profiliranje, najviše MAX_SAMPLE_RATE), a direktorij varijablom
+    MIX_PROFILE_DIR. U direktoriju ostaje najviše max_files ispisa.
+    """
+
+    def __init__(self, sample_rate, directory, max_files):
+        self.sample_rate = min(sample_rate, MAX_SAMPLE_RATE)
+        self.directory = directory
+        self.max_files = max_files
+        self.written = 0
+
+    def start(self):
+        """Pokreće profiler ako je zahtjev odabran; vraća profiler ili None"""
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Drugi profiler je već aktivan u ovoj dretvi
+            return None
+        return profiler
+
+    def finish(self, profiler, route):
+        profiler.disable()
+        os.makedirs(self.directory, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        path = os.path.join(self.directory, f"{slug}-{time.time_ns()}-{os.getpid()}.prof")
+        profiler.dump_stats(path)
+        self.written += 1
+        self._rotate()
+        return path
+
+    def _rotate(self):
+        """Briše najstarije ispise iznad max_files; direktorij mogu dijeliti svi workeri"""
+        dumps = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".prof"):
+                try:
+                    dumps.append((entry.stat().st_mtime_ns, entry.path))
+                except FileNotFoundError:
+                    # Drugi worker ga je već obrisao
+                    continue
+        dumps.sort()
+        for _, path in dumps[:max(0, len(dumps) - self.max_files)]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+profiler = SamplingProfiler(
+    float(os.environ.get("MIX_PROFILE_SAMPLE_RATE", 0)),
+    os.environ.get("MIX_PROFILE_DIR", DEFAULT_PROFILE_DIR),
+    int(os.environ.get("MIX_PROFILE_MAX_FILES", DEFAULT_PROFILE_MAX_FILES)),
+)
@@ -0,0 +1,75 @@
+import numpy as np
+
+# Težina retka koji zahtijeva da udjeli zbrojeni daju 1; atributi su skalirani na red veličine 1
+SUM_WEIGHT = 1e4
+
+# Najveći broj vanjskih koraka NNLS-a po komponenti
+MAX_ITERATIONS_PER_COMPONENT = 3
+
+def nnls(A, b):
+    """Nenegativni najmanji kvadrati (Lawson–Hanson): min ||A x - b|| uz x >= 0
+
+    Aktivni skup kreće prazan; u svakom koraku u pasivni skup ulazi varijabla
+    s najvećim gradijentom, a unutarnja petlja vraća na nulu varijable koje bi
+    rješenje najmanjih kvadrata na pasivnom skupu učinilo negativnima.
+    """
+    A = np.asarray(A, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    m, n = A.shape
+    tolerance = 10 * np.finfo(np.float64).eps * np.abs(A).sum(axis=0).max(initial=0.0) * max(m, n)
+
+    x = np.zeros(n)
+    passive = np.zeros(n, dtype=bool)
+    gradient = A.T @ b
+    for _ in range(MAX_ITERATIONS_PER_COMPONENT * n):
+        candidates = np.where(passive, -np.inf, gradient)
+        j = int(np.argmax(candidates))
+        if candidates[j] <= tolerance:
+            break
+        passive[j] = True
+
+        while True:
+            z = np.zeros(n)
+            z[passive] = np.linalg.lstsq(A[:, passive], b, rcond=None)[0]
+            if (z[passive] > 0).all():
+                x = z
+                break
+            # Pomak prema z do prve varijable koja dosegne nulu
+            blocking = passive & (z <= 0)
+            alpha = np.min(x[blocking] / (x[blocking] - z[blocking]))
+            x = x + alpha * (z - x)
+            passive &= x > tolerance
+            x[~passive] = 0.0
+
+        gradient = A.T @ (b - A @ x)
+    return x
+
+def attribute_scales(properties, targets):
+    """Raspon svakog atributa među komponentama i ciljem; 1 za konstantne atribute"""
+    values = np.vstack([properties, targets])
+    scales = values.max(axis=0) - values.min(axis=0)
+    return np.where(scales > 0, scales, 1.0)
+
+def solve_blend(properties, targets, weights=None):
+    """Nenegativni udjeli komponenti koji što bliže pogađaju sve ciljane atribute
+
+    `properties` je matrica oblika (komponente, atributi). Budući da se udjeli
+    zbrajaju u 1, odstupanje smjese je (P - t)^T x, pa se atributi centriraju
+    na cilj i dijele rasponom (i množe težinom) kako bi bili usporedivi bez
+    obzira na mjernu jedinicu. Zbroj udjela zadan je retkom velike težine, a
+    rezultat se na kraju normira. Ako cilj nije dostižan, vraća najbližu
+    smjesu u smislu težinskih najmanjih kvadrata.
+
+    Vraća polje udjela duljine broja komponenti.
+    """
+    properties = np.asarray(properties, dtype=np.float64)
+    targets = np.asarray(targets, dtype=np.float64)
+    weights = np.ones(len(targets)) if weights is None else np.asarray(weights, dtype=np.float64)
+
+    scaled = (properties - targets).T * (weights / attribute_scales(properties, targets))[:, None]
+    A = np.vstack([scaled, np.full(len(properties), SUM_WEIGHT)])
+    b = np.zeros(len(A))
+    b[-1] = SUM_WEIGHT
+
+    shares = nnls(A, b)
+    return shares / shares.sum()
@@ -0,0 +1,95 @@
+import numpy as np
+
+# Najveći broj koraka bisekcije po Lagrangeovom multiplikatoru
+MAX_ITERATIONS = 100
+
+# Relativna širina intervala multiplikatora na kojoj bisekcija staje
+RELATIVE_WIDTH = 1e-12
+
+def _greedy_fill(keys, stock, total_amount):
+    """Puni količinu redom od najmanjeg ključa, poštujući zalihe"""
+    order = np.argsort(keys)
+    filled = np.cumsum(stock[order])
+    last = int(np.searchsorted(filled, total_amount))
+    quantities = np.zeros(len(keys))
+    quantities[order[:last]] = stock[order[:last]]
+    if last < len(order):
+        quantities[order[last]] = total_amount - (filled[last - 1] if last else 0.0)
+    return quantities
+
+def optimize_blend(intensities, unit_costs, stock, total_amount, desired_intensity):
+    """Najjeftinija smjesa zadane količine i intenziteta iz zalihe lotova
+
+    Rješava linearni program: minimiziraj sum(c_i x_i) uz sum(x_i) = S,
+    sum(a_i x_i) = m S i 0 <= x_i <= zaliha_i. Lotovi se dijele na lošije
+    (a_i < m) i bolje (a_i > m); multiplikator v određuje koliko se lošiji
+    lotovi "kažnjavaju" u odnosu na bolje, pa se za zadani v smjesa puni
+    pohlepno po cijeni c_i - v (a_i - m). Odstupanje takve smjese od cilja
+    raste s v, pa se bisekcijom traži v u kojem ono mijenja predznak. Optimum
+    je konveksna kombinacija dvaju pohlepnih rješenja oko te točke.
+
+    Vraća polje količina ili rječnik s greškom.
+    """
+    intensities = np.asarray(intensities, dtype=np.float64)
+    unit_costs = np.asarray(unit_costs, dtype=np.float64)
+    stock = np.asarray(stock, dtype=np.float64)
+    excess = intensities - desired_intensity
+
+    if stock.sum() < total_amount:
+        return {"error": "Ukupna zaliha manja je od tražene količine"}
+
+    # Krajnji slučajevi: najviše lošijih odnosno najviše boljih lotova
+    low = _greedy_fill(excess, stock, total_amount)
+    high = _greedy_fill(-excess, stock, total_amount)
+    tolerance = 1e-9 * total_amount * max(1.0, np.abs(excess).max())
+    if excess @ low > tolerance or excess @ high < -tolerance:
+        return {"error": f"Željeni intenzitet {desired_intensity} nije moguće postići s raspoloživom zalihom"}
+
+    # Za |v| veći od ovog raspona redoslijed određuje samo intenzitet
+    levels = np.unique(excess)
+    if len(levels) == 1:
+        return _greedy_fill(unit_costs, stock, total_amount)
+    bound = 2 * (np.ptp(unit_costs) + 1) / np.diff(levels).min()
+    scale = min(bound, max(np.ptp(unit_costs), 1e-12) / np.ptp(excess))
+
+    def fill(v):
+        x = _greedy_fill(unit_costs - v * excess, stock, total_amount)
+        return x, excess @ x
+
+    # Proširuj interval od v = 0 dok odstupanje ne promijeni predznak
+    x_mid, e_mid = fill(0.0)
+    if abs(e_mid) <= tolerance:
+        return x_mid
+    direction = 1.0 if e_mid < 0 else -1.0
+    near, x_near, e_near = 0.0, x_mid, e_mid
+    step = scale
+    while True:
+        far = direction * min(step, bound)
+        x_far, e_far = fill(far)
+        if abs(e_far) <= tolerance:
+            return x_far
+        if (e_far > 0) == (direction > 0) or step >= bound:
+            break
+        near, x_near, e_near = far, x_far, e_far
+        step *= 4
+
+    if direction > 0:
+        lo, x_lo, e_lo, hi, x_hi, e_hi = near, x_near, e_near, far, x_far, e_far
+    else:
+        lo, x_lo, e_lo, hi, x_hi, e_hi = far, x_far, e_far, near, x_near, e_near
+
+    for _ in range(MAX_ITERATIONS):
+        mid = (lo + hi) / 2
+        if not lo < mid < hi or hi - lo <= RELATIVE_WIDTH * max(abs(lo), abs(hi), scale):
+            break
+        x_mid, e_mid = fill(mid)
+        if abs(e_mid) <= tolerance:
+            return x_mid
+        if e_mid < 0:
+            lo, x_lo, e_lo = mid, x_mid, e_mid
+        else:
+            hi, x_hi, e_hi = mid, x_mid, e_mid
+
+    # Kombinacija dvaju rješenja koja točno pogađa željeni intenzitet
+    weight = e_hi / (e_hi - e_lo)
+    return weight * x_lo + (1 - weight) * x_hi
@@ -0,0 +1,49 @@
+import math
+
+# Broj decimalnih mjesta koji se uzima u obzir pri skraćivanju omjera
+DECIMAL_PLACES = 10
+
+def gcd_all(numbers):
+    """Najveći zajednički djelitelj cijelog vektora (iterativno)"""
+    return math.gcd(*numbers)
+
+def reduce_integers(numbers):
+    """Skraćuje cjelobrojni omjer zajedničkim djeliteljem"""
+    divisor = gcd_all(numbers)
+    if divisor <= 1:
+        return list(numbers)
+    return [number // divisor for number in numbers]
+
+def _trailing_zeros(numbers, limit):
+    # Broj nula na kraju zajednički svim brojevima različitim od nule
+    zeros = 0
+    while zeros < limit and all(number % 10 ** (zeros + 1) == 0 for number in numbers if number):
+        zeros += 1
+    return zeros
+
+def simplify_ratio(ratios, places=DECIMAL_PLACES):
+    """Pojednostavljeni cjelobrojni omjer iz decimalnog zapisa vrijednosti
+
+    Svaka vrijednost se zaokružuje na `places` decimala i tumači kao točan
+    decimalni broj, pa nema množenja s 10^places u pomičnom zarezu.
+    Zajednička potencija broja 10 uklanja se zajedno s ostatkom najvećeg
+    zajedničkog djelitelja; nule se podižu na 1 kao u izvornom algoritmu.
+    Beskonačne vrijednosti i NaN podižu OverflowError (ArithmeticError).
+    """
+    if not all(math.isfinite(ratio) for ratio in ratios):
+        raise OverflowError("Omjer mora sadržavati konačne brojeve")
+    spec = f".{places}f"
+    digits = [int(format(abs(ratio), spec).replace(".", "")) for ratio in ratios]
+
+    if 0 in digits:
+        # Skaliraj samo koliko zahtijeva vrijednost s najviše decimala
+        scale = 10 ** _trailing_zeros(digits, places)
+        digits = [max(1, number // scale) for number in digits]
+    return reduce_integers(digits)
+
+def format_ratio(int_ratios):
+    return " : ".join(map(str, int_ratios))
+
+def format_simplified_ratio(ratios):
+    """Stvara pojednostavljeni omjer s cijelim brojevima"""
+    return format_ratio(simplify_ratio(ratios))
@@ -0,0 +1,120 @@
+import math
+
+# Poruka za nedostajuće obavezno polje; {name} je naziv polja
+MISSING_MESSAGE = "Nedostaje polje '{name}'"
+
+NOT_OBJECT_MESSAGE = "Tijelo zahtjeva mora biti JSON objekt"
+
+class SchemaError(ValueError):
+    """Neispravan ulaz; poruka je spremna za odgovor klijentu"""
+
+_REQUIRED = object()
+
+def number(message="Molimo unesite ispravne numeričke vrijednosti", check=None):
+    """Konačan broj; prihvaća i numeričke stringove (npr. iz CSV-a)
+
+    `check` je par (predikat, poruka) za dodatnu provjeru vrijednosti.
+    """
+    predicate, check_message = check if check is not None else (None, None)
+
+    def coerce(value):
+        value_type = type(value)
+        if value_type is float or value_type is int or value_type is str:
+            try:
+                result = float(value)
+            except (OverflowError, ValueError):
+                # OverflowError: cijeli broj izvan raspona float
+                raise SchemaError(message) from None
+        else:
+            # bool i None nisu brojevi
+            raise SchemaError(message)
+        if not math.isfinite(result):
+            raise SchemaError(message)
+        if predicate is not None and not predicate(result):
+            raise SchemaError(check_message)
+        return result
+
+    return coerce
+
+def integer(message="Molimo unesite ispravan cijeli broj"):
+    def coerce(value):
+        if type(value) is int:
+            return value
+        if type(value) is str:
+            try:
+                return int(value)
+            except ValueError:
+                raise SchemaError(message) from None
+        if type(value) is float and value.is_integer():
+            return int(value)
+        raise SchemaError(message)
+
+    return coerce
+
+def string(message="Očekivan je tekst"):
+    def coerce(value):
+        if type(value) is not str:
+            raise SchemaError(message)
+        return value
+
+    return coerce
+
+def boolean(message="Očekivana je vrijednost true ili false"):
+    def coerce(value):
+        if type(value) is not bool:
+            raise SchemaError(message)
+        return value
+
+    return coerce
+
+def array(item, min_items=0, max_items=None, message="Očekivana je lista", length_message=None):
+    """Lista čiji se elementi provjeravaju s `item`; {index} u porukama elementa je redni broj od 1"""
+    length_message = length_message or message
+
+    def coerce(value):
+        if type(value) is not list:
+            raise SchemaError(message)
+        if len(value) < min_items or (max_items is not None and len(value) > max_items):
+            raise SchemaError(length_message)
+        result = []
+        for index, element in enumerate(value):
+            try:
+                result.append(item(element))
+            except SchemaError as e:
+                raise SchemaError(str(e).format(index=index + 1)) from None
+        return result
+
+    return coerce
+
+def optional(validator, default=None):
+    """Polje koje smije nedostajati ili biti null; tada dobiva `default`"""
+    return (validator, default)
+
+def compile_schema(fields, message=NOT_OBJECT_MESSAGE, missing_message=MISSING_MESSAGE):
+    """Pretvara opis polja u funkciju koja validira i pretvara JSON objekt
+
+    `fields` preslikava naziv polja u validator ili u optional(validator,
+    default). Dobivena funkcija vraća novi rječnik samo s opisanim poljima
+    ili podiže SchemaError s porukom za klijenta. Opis se obrađuje jednom,
+    pri učitavanju modula.
+    """
+    compiled = []
+    for name, spec in fields.items():
+        validator, default = spec if isinstance(spec, tuple) else (spec, _REQUIRED)
+        compiled.append((name, validator, default, missing_message.format(name=name)))
+
+    def validate(data):
+        if type(data) is not dict:
+            raise SchemaError(message)
+        result = {}
+        for name, validator, default, missing in compiled:
+            value = data.get(name)
+            if value is None:
+                if default is _REQUIRED:
+                    raise SchemaError(missing)
+                result[name] = default
+            else:
+                result[name] = validator(value)
+        return result
+
+    return validate
@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+# Testovi se pokreću iz direktorija backend ili iz korijena repozitorija
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
@@ -0,0 +1,43 @@
+import pytest
+
+from services.metrics import MAX_SAMPLE_RATE, SamplingProfiler, profiler
+
+
+@pytest.fixture(autouse=True)
+def admin_settings(monkeypatch):
+    monkeypatch.delenv("MIX_ADMIN_TOKEN", raising=False)
+    monkeypatch.setattr(profiler, "sample_rate", 0)
+
+
+def test_admin_routes_are_local_only_without_token(client):
+    assert client.get("/api/admin/cache").status_code == 200
+    remote = {"REMOTE_ADDR": "203.0.113.7"}
+    assert client.delete("/api/admin/cache", environ_base=remote).status_code == 403
+    assert client.put("/api/admin/profile", json={"sample_rate": 0.01}, environ_base=remote).status_code == 403
+    # Zahtjev proslijeđen preko lokalnog proxyja
+    assert client.delete("/api/admin/cache", headers={"X-Forwarded-For": "203.0.113.7"}).status_code == 403
+
+
+def test_admin_token(client, monkeypatch):
+    monkeypatch.setenv("MIX_ADMIN_TOKEN", "secret")
+    remote = {"REMOTE_ADDR": "203.0.113.7"}
+    assert client.get("/api/admin/profile").status_code == 401
+    assert client.get("/api/admin/profile", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    response = client.get("/api/admin/profile", headers={"Authorization": "Bearer secret"}, environ_base=remote)
+    assert response.status_code == 200
+
+
+def test_sample_rate_is_capped(client):
+    assert client.put("/api/admin/profile", json={"sample_rate": 1}).status_code == 400
+    response = client.put("/api/admin/profile", json={"sample_rate": MAX_SAMPLE_RATE})
+    assert response.get_json()["sample_rate"] == MAX_SAMPLE_RATE
+    assert SamplingProfiler(1.0, "", 10).sample_rate == MAX_SAMPLE_RATE
+
+
+def test_profile_dumps_are_rotated(tmp_path):
+    sampler = SamplingProfiler(MAX_SAMPLE_RATE, str(tmp_path), 3)
+    for _ in range(10):
+        sampler.sample_rate = 1
+        sampler.finish(sampler.start(), "/api/mix/simple")
+    assert len(list(tmp_path.glob("*.prof"))) == 3
+    assert sampler.written == 10
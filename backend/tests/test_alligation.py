@@ -0,0 +1,87 @@
+import time
+from itertools import combinations
+
+import pytest
+
+from routes.complex_mix import MAX_COMPONENTS, MAX_SCAN
+from services.alligation import enumerate_schemes, iter_solutions, solutions_page
+
+
+def brute_force_schemes(worse, better):
+    """Svi skupovi parova u kojima je svaka komponenta sparena i svaki par ima kraj stupnja 1"""
+    edges = [(w, b) for w in worse for b in better]
+    schemes = set()
+    for size in range(1, len(edges) + 1):
+        for subset in combinations(edges, size):
+            degree = {}
+            for w, b in subset:
+                degree[w] = degree.get(w, 0) + 1
+                degree[b] = degree.get(b, 0) + 1
+            if len(degree) == len(worse) + len(better) and all(degree[w] == 1 or degree[b] == 1 for w, b in subset):
+                schemes.add(frozenset(subset))
+    return schemes
+
+
+@pytest.mark.parametrize("worse_count,better_count", [
+    (w, b) for w in range(1, 5) for b in range(1, 5) if w + b <= 6
+])
+def test_enumerate_schemes_matches_brute_force(worse_count, better_count):
+    worse = tuple(range(worse_count))
+    better = tuple(range(worse_count, worse_count + better_count))
+    schemes = [frozenset(scheme) for scheme in enumerate_schemes(worse, better)]
+    assert len(schemes) == len(set(schemes))
+    assert set(schemes) == brute_force_schemes(worse, better)
+
+
+def test_known_scheme_counts():
+    assert len(list(enumerate_schemes((0, 1), (2, 3)))) == 2
+    assert len(list(enumerate_schemes((0, 1, 2), (3,)))) == 1
+    assert len(list(enumerate_schemes((0,), (1, 2, 3)))) == 1
+
+
+def test_solutions_hit_desired_intensity():
+    intensities = [10, 25, 40, 70, 85, 95]
+    desired = 55
+    for solution in iter_solutions(intensities, desired):
+        ratios = solution["ratios"]
+        assert all(ratio > 0 for ratio in ratios)
+        average = sum(i * r for i, r in zip(intensities, ratios)) / sum(ratios)
+        assert average == pytest.approx(desired)
+
+
+@pytest.mark.parametrize("worse_count", [1, MAX_COMPONENTS - 1])
+def test_lopsided_split_is_fast(worse_count):
+    # 1+k i k+1 imaju jedno rješenje; prije se prolazilo kroz 2^k podskupova
+    intensities = [float(i) for i in range(MAX_COMPONENTS)]
+    desired = worse_count - 0.5
+    started = time.perf_counter()
+    page, has_more = solutions_page(intensities, desired, 0, 20)
+    assert time.perf_counter() - started < 0.1
+    assert len(page) == 1 and not has_more
+
+
+def test_worst_case_request_is_bounded(client):
+    # Jednaki intenziteti daju mnogo duplikata; broj pregledanih shema je ograničen
+    intensities = [10.0] * (MAX_COMPONENTS // 2) + [90.0] * (MAX_COMPONENTS - MAX_COMPONENTS // 2)
+    body = {
+        "components": [{"intensity": intensity} for intensity in intensities],
+        "total_amount": 100,
+        "desired_intensity": 50,
+        "cursor": str(MAX_SCAN - 20),
+        "page_size": 20,
+    }
+    started = time.perf_counter()
+    response = client.post("/api/mix/complex", json=body)
+    assert time.perf_counter() - started < 2
+    assert response.status_code in (200, 400)
+
+
+def test_cursor_is_capped(client):
+    body = {
+        "components": [{"intensity": intensity} for intensity in (10, 20, 30, 70, 80, 90)],
+        "total_amount": 100,
+        "desired_intensity": 50,
+        "cursor": str(MAX_SCAN),
+    }
+    response = client.post("/api/mix/complex", json=body)
+    assert response.status_code == 400
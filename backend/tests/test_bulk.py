@@ -0,0 +1,45 @@
+import time
+
+from routes.bulk_mix import LINE_TOO_LONG, MAX_LINE_BYTES
+
+
+def _bulk(client, body, content_type, mode="simple"):
+    response = client.post(f"/api/mix/bulk?mode={mode}", data=body, content_type=content_type)
+    assert response.status_code == 200
+    return response.get_data(as_text=True).splitlines()
+
+
+def test_ndjson_line_too_long(client):
+    row = '{"a1": 600, "a2": 900, "m": 750, "S": 100}'
+    long_row = '{"a1": 600, "pad": "' + "x" * (3 * MAX_LINE_BYTES) + '"}'
+    lines = _bulk(client, "\n".join([row, long_row, row]) + "\n", "application/x-ndjson")
+    assert len(lines) == 3
+    assert '"line": 2' in lines[1] and LINE_TOO_LONG in lines[1]
+    assert '"line": 3' in lines[2] and "simplified_ratio" in lines[2]
+
+
+def test_ndjson_deeply_nested_line(client):
+    row = '{"a1": 600, "a2": 900, "m": 750, "S": 100}'
+    lines = _bulk(client, "\n".join([row, "[" * 40000, row]) + "\n", "application/x-ndjson")
+    assert len(lines) == 3
+    assert '"line": 2' in lines[1] and "Neispravan JSON redak" in lines[1]
+    assert '"line": 3' in lines[2] and "simplified_ratio" in lines[2]
+
+
+def test_csv_line_too_long(client):
+    body = "a1,a2,m,S\n600,900,750,100\n" + "1" * (2 * MAX_LINE_BYTES) + ",900,750,100\n\n600,900,800,50\n"
+    lines = _bulk(client, body, "text/csv")
+    assert lines[0] == "a1,a2,m,S,quantities,simplified_ratio,combinations,error"
+    assert len(lines) == 4
+    assert lines[2].endswith(LINE_TOO_LONG)
+    assert lines[3].startswith("600,900,800,50,")
+    assert not lines[3].endswith(LINE_TOO_LONG)
+
+
+def test_complex_rows_with_many_components_are_bounded(client):
+    intensities = ";".join(str(10 + 3 * i) for i in range(30))
+    body = "intensities,desired_intensity,total_amount\n" + f"{intensities},50,100\n" * 3
+    start = time.perf_counter()
+    lines = _bulk(client, body, "text/csv", mode="complex")
+    assert time.perf_counter() - start < 5
+    assert len(lines) == 4
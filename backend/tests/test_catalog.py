@@ -0,0 +1,48 @@
+import pytest
+
+import services.catalog
+
+
+@pytest.fixture(autouse=True)
+def catalog(tmp_path, monkeypatch):
+    monkeypatch.setenv("CATALOG_DIR", str(tmp_path))
+    monkeypatch.setattr(services.catalog, "_catalog", None)
+
+
+def _upsert(client, *components):
+    return client.post("/api/catalog/components", json={"components": list(components)})
+
+
+def test_upsert_and_nearest(client):
+    response = _upsert(client, {"name": "A", "intensity": 600}, {"intensity": "700.5", "stock": 3})
+    assert response.status_code == 200
+    assert response.get_json()["ids"] == [1, 2]
+    nearest = client.get("/api/catalog/components/nearest?intensity=690").get_json()
+    assert nearest["above"][0]["intensity"] == 700.5
+
+
+@pytest.mark.parametrize("component", [
+    {"intensity": "nan"},
+    {"intensity": "inf"},
+    {"intensity": True},
+    {"intensity": None},
+    {"intensity": 600, "unit_cost": "nan"},
+    {"intensity": 600, "stock": -1},
+    {"intensity": 600, "id": 1.7},
+    {"intensity": 600, "id": "1"},
+    {"intensity": 600, "id": True},
+    "x",
+])
+def test_invalid_component_is_rejected(client, component):
+    _upsert(client, {"name": "A", "intensity": 600})
+    response = _upsert(client, component)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+    # Postojeća komponenta 1 nije prepisana
+    assert client.get("/api/catalog/components/1").get_json()["name"] == "A"
+
+
+def test_non_json_body_gets_json_error(client):
+    response = client.post("/api/catalog/components", data="not json", content_type="text/plain")
+    assert response.status_code == 400
+    assert "error" in response.get_json()
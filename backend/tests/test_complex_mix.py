@@ -0,0 +1,102 @@
+import pytest
+
+from services.ratio import simplify_ratio
+
+HUGE = 1e308
+
+
+@pytest.mark.parametrize("intensities,desired", [
+    ([-HUGE, -HUGE, HUGE], 0),
+    ([-HUGE, HUGE, HUGE], 0),
+    ([-HUGE, -HUGE, HUGE, HUGE], 0),
+    ([-HUGE, -HUGE, -HUGE, HUGE], 0),
+    ([-HUGE, -HUGE, HUGE, HUGE, HUGE], 0),
+])
+def test_overflowing_ratios_are_rejected(client, intensities, desired):
+    # Regresija: beskonačni omjeri rušili su skraćivanje omjera (500)
+    body = {"components": [{"intensity": i} for i in intensities], "total_amount": 1, "desired_intensity": desired}
+    response = client.post("/api/mix/complex", json=body)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+    query = "&".join(f"intensity={i!r}" for i in intensities)
+    response = client.get(f"/api/mix/complex?{query}&total_amount=1&desired_intensity={desired}")
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("ratios", [[1.0, float("inf")], [float("nan"), 2.0]])
+def test_simplify_ratio_rejects_non_finite(ratios):
+    with pytest.raises(ArithmeticError):
+        simplify_ratio(ratios)
+
+
+def test_regular_request_still_succeeds(client):
+    body = {"components": [{"intensity": 10}, {"intensity": 20}, {"intensity": 50}], "total_amount": 10,
+            "desired_intensity": 30}
+    response = client.post("/api/mix/complex", json=body)
+    assert response.status_code == 200
+    assert response.get_json()["simplified_ratio"] == "2 : 2 : 3"
+
+
+@pytest.mark.parametrize("bad", [True, False, "nan", "inf", None])
+def test_batch_rejects_the_same_recipe_as_single(client, bad):
+    intensities = [10, bad, 60]
+    single = client.post("/api/mix/complex", json={
+        "components": [{"intensity": intensity} for intensity in intensities], "total_amount": 10, "desired_intensity": 30
+    }).get_json()
+    batch = client.post("/api/mix/complex/batch", json={
+        "intensities": [intensities, [10, 20, 60]], "total_amount": [10, 10], "desired_intensity": [30, 30]
+    }).get_json()
+    if bad is not None:
+        assert batch["results"][0]["error"] == single["error"] == "Intenzitet komponente 2 mora biti broj"
+    assert "error" not in batch["results"][1]
+
+
+@pytest.mark.parametrize("field", ["total_amount", "desired_intensity"])
+@pytest.mark.parametrize("bad", [True, "nan", "inf"])
+def test_batch_rejects_non_numbers(client, field, bad):
+    body = {"intensities": [[10, 20, 60]], "total_amount": [10], "desired_intensity": [30]}
+    body[field] = [bad]
+    result = client.post("/api/mix/complex/batch", json=body).get_json()
+    assert result["results"][0]["error"] == "Molimo unesite ispravne numeričke vrijednosti"
+
+
+def test_duplicate_intensities_map_per_index(client):
+    intensities = [51.4, 81.1, 28.4, 81.1]
+    body = {"components": [{"intensity": i} for i in intensities], "total_amount": 10, "desired_intensity": 74.69}
+    posted = client.post("/api/mix/complex", json=body).get_json()
+    query = "&".join(f"intensity={i}" for i in intensities) + "&total_amount=10&desired_intensity=74.69"
+    fetched = client.get(f"/api/mix/complex?{query}").get_json()
+    batch = client.post("/api/mix/complex/batch", json={
+        "intensities": [intensities], "total_amount": [10], "desired_intensity": [74.69]
+    }).get_json()["results"][0]
+    sweep = client.post("/api/mix/complex/sweep", json={**body, "targets": [74.69]}).get_json()
+
+    for result in (posted, fetched):
+        solutions = result["method_details"]["all_solutions"]
+        assert [solution["simplified_ratio"] for solution in solutions] == batch["simplified_ratio"]
+        for solution, expected in zip(solutions, batch["quantities"]):
+            assert solution["quantities"] == pytest.approx(expected)
+            assert sum(solution["quantities"]) == pytest.approx(10)
+    assert sweep["quantities"][0] == pytest.approx(batch["quantities"][0])
+    assert sweep["alternative_quantities"][0] == pytest.approx(batch["quantities"][1])
+
+
+BIG = "1" + "0" * 400
+
+
+@pytest.mark.parametrize("url,body,error", [
+    ("/api/mix/simple", '{"a1": %s, "a2": 900, "m": 750, "S": 100}' % BIG, "Molimo unesite ispravne numeričke vrijednosti"),
+    ("/api/mix/complex", '{"components": [{"intensity": 10}, {"intensity": %s}, {"intensity": 60}], '
+                         '"total_amount": 10, "desired_intensity": 30}' % BIG, "Intenzitet komponente 2 mora biti broj"),
+])
+def test_integers_beyond_64_bits_get_field_errors(client, url, body, error):
+    response = client.post(url, data=body, content_type="application/json")
+    assert response.status_code == 400
+    assert response.get_json()["error"] == error
+
+
+def test_integers_beyond_64_bits_in_batch(client):
+    body = '{"a1": [600, %s], "a2": [900, 900], "m": [750, 750], "S": [100, 100]}' % BIG
+    result = client.post("/api/mix/simple/batch", data=body, content_type="application/json").get_json()
+    assert result["errors"] == [None, "Molimo unesite ispravne numeričke vrijednosti"]
@@ -0,0 +1,82 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import services.jobs
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Drugi gunicorn worker: novi proces nad istim direktorijem poslova
+OTHER_WORKER = """
+import json, sys
+from services.filelock import try_lock
+from services.jobs import JobManager
+manager = JobManager(sys.argv[1], 1, 16, 900)
+print(json.dumps({
+    "pool_lock": try_lock(sys.argv[1] + "/POOL.lock") is not None,
+    "snapshot": manager.snapshot(sys.argv[2]),
+}))
+"""
+
+
+@pytest.fixture(autouse=True)
+def job_manager(tmp_path, monkeypatch):
+    monkeypatch.setenv("MIX_JOB_DIR", str(tmp_path))
+    monkeypatch.setenv("MIX_JOB_WORKERS", "1")
+    monkeypatch.setenv("MIX_JOB_QUEUE", "2")
+    monkeypatch.setattr(services.jobs, "_manager", None)
+
+
+def _batch(rows):
+    return {"type": "simple_batch", "payload": {"a1": [600] * rows, "a2": [900] * rows, "m": [750] * rows, "S": [100] * rows}}
+
+
+def _wait(client, job_id):
+    for _ in range(200):
+        snapshot = client.get(f"/api/jobs/{job_id}").get_json()
+        if snapshot["status"] not in ("queued", "running"):
+            return snapshot
+        time.sleep(0.05)
+    raise AssertionError("Posao nije završio")
+
+
+def _other_worker(root, job_id):
+    output = subprocess.run(
+        [sys.executable, "-c", OTHER_WORKER, str(root), job_id],
+        cwd=BACKEND, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output)
+
+
+def test_job_is_visible_from_another_process(client, tmp_path):
+    response = client.post("/api/jobs", json=_batch(250_000))
+    assert response.status_code == 202
+    job_id = response.get_json()["id"]
+    assert _wait(client, job_id)["result"]["count"] == 250_000
+
+    other = _other_worker(tmp_path, job_id)
+    # Skup procesa ima samo jedan proces na računalu
+    assert other["pool_lock"] is False
+    assert other["snapshot"]["status"] == "done"
+    assert other["snapshot"]["result"]["count"] == 250_000
+    assert other["snapshot"]["result"]["quantities"][0] == client.get(f"/api/jobs/{job_id}").get_json()["result"]["quantities"][0]
+
+
+def test_cancel_and_queue_limit(client):
+    first = client.post("/api/jobs", json=_batch(1_000_000)).get_json()["id"]
+    client.post("/api/jobs", json=_batch(1_000_000))
+    full = client.post("/api/jobs", json=_batch(10))
+    assert full.status_code == 429
+    assert full.headers["Retry-After"]
+
+    assert client.delete(f"/api/jobs/{first}").get_json()["status"] == "cancelled"
+    assert client.post("/api/jobs", json=_batch(10)).status_code == 202
+
+
+def test_unknown_job(client):
+    assert client.get("/api/jobs/0123abcd").status_code == 404
+    assert client.delete("/api/jobs/0123abcd").status_code == 404
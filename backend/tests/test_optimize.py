@@ -0,0 +1,43 @@
+import pytest
+
+LOTS = [
+    {"name": "A", "intensity": 600, "unit_cost": 2, "stock": 50},
+    {"name": "B", "intensity": 900, "unit_cost": 1},
+]
+
+
+def _optimize(client, **body):
+    return client.post("/api/mix/optimize", json={"total_amount": 10, "desired_intensity": 750, **body})
+
+
+def test_valid_lots(client):
+    response = _optimize(client, lots=LOTS)
+    assert response.status_code == 200
+    assert sum(response.get_json()["quantities"]) == pytest.approx(10)
+
+
+@pytest.mark.parametrize("lots", [
+    ["x", "y"],
+    [LOTS[0], {"intensity": True, "unit_cost": 1}],
+    [LOTS[0], {"intensity": "nan", "unit_cost": 1}],
+    [LOTS[0], {"intensity": 900, "unit_cost": "inf"}],
+    [LOTS[0], {"intensity": 900, "unit_cost": 1, "stock": "nan"}],
+    [LOTS[0], {"intensity": 900, "unit_cost": 1, "stock": -1}],
+])
+def test_invalid_lots(client, lots):
+    response = _optimize(client, lots=lots)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+@pytest.mark.parametrize("columns", [
+    {"intensity": [600, True], "unit_cost": [2, 1]},
+    {"intensity": [600, 900], "unit_cost": [2, None]},
+    {"intensity": [600, 900], "unit_cost": [2, 1], "stock": [50, "nan"]},
+    {"intensity": [600, 900], "unit_cost": [2, 1], "stock": [50, -1]},
+    {"intensity": "600", "unit_cost": [2, 1]},
+])
+def test_invalid_columns(client, columns):
+    response = _optimize(client, **columns)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
@@ -0,0 +1,33 @@
+import random
+
+import pytest
+
+from benchmarks.ratio_bench import legacy_format_simplified_ratio
+from services.ratio import format_simplified_ratio, simplify_ratio
+
+
+@pytest.mark.parametrize("ratios,expected", [
+    ([1 / 3, 2 / 3], "3333333333 : 6666666667"),
+    ([0.5, 0.25], "2 : 1"),
+    ([2.0, 4.0, 6.0], "1 : 2 : 3"),
+    ([0, 3.5], "1 : 35"),
+    ([72.3456, 27.6544], "11304 : 4321"),
+    ([100.0], "1"),
+])
+def test_known_ratios(ratios, expected):
+    assert format_simplified_ratio(ratios) == expected == legacy_format_simplified_ratio(ratios)
+
+
+@pytest.mark.parametrize("decimals", range(11))
+def test_matches_legacy_algorithm(decimals):
+    rng = random.Random(decimals)
+    for _ in range(500):
+        ratios = [
+            rng.choice([0.0, float(rng.randint(1, 50)), round(rng.uniform(0.001, 1000), decimals)])
+            for _ in range(rng.randint(1, 5))
+        ]
+        assert format_simplified_ratio(ratios) == legacy_format_simplified_ratio(ratios), ratios
+
+
+def test_places():
+    assert simplify_ratio([1.234, 2.0], places=2) == [123, 200]
@@ -0,0 +1,35 @@
+import pytest
+
+from routes.simple_mix import _parse_column
+
+INVALID = "Molimo unesite ispravne numeričke vrijednosti"
+
+
+@pytest.mark.parametrize("value", [None, True, False, "abc", "nan", "inf", [1]])
+def test_invalid_values_are_row_errors(client, value):
+    body = {"a1": [600, value, 600], "a2": [900, 900, 900], "m": [750, 750, 750], "S": [100, 100, 100]}
+    result = client.post("/api/mix/simple/batch", json=body).get_json()
+    assert result["errors"] == [None, INVALID, None]
+    assert result["quantities"][1] is None
+    assert result["quantities"][0] == result["quantities"][2]
+
+
+def test_invalid_values_in_rows_form(client):
+    rows = [[600, 900, 750, 100], {"a1": 600, "a2": 900, "m": True, "S": 100}, [600, 900, 750, None]]
+    result = client.post("/api/mix/simple/batch", json={"rows": rows}).get_json()
+    assert result["errors"] == [None, INVALID, INVALID]
+
+
+def test_numeric_strings_match_single_request(client):
+    body = {"a1": ["600", 600.0], "a2": ["900", 900], "m": ["750", 750], "S": ["100", 100]}
+    result = client.post("/api/mix/simple/batch", json=body).get_json()
+    single = client.post("/api/mix/simple", json={"a1": 600, "a2": 900, "m": 750, "S": 100}).get_json()
+    assert result["errors"] == [None, None]
+    assert result["quantities"][0] == result["quantities"][1] == single["quantities"]
+
+
+def test_parse_column_flags_non_numbers():
+    column, invalid = _parse_column([1, 2.5, 10 ** 400])
+    assert invalid.tolist() == [False, False, True]
+    assert column[:2].tolist() == [1.0, 2.5]
+    assert _parse_column([1, 2.5])[1] is None
@@ -0,0 +1,28 @@
+import math
+
+import pytest
+
+
+@pytest.mark.parametrize("step", [5e-324, 1e-300])
+def test_tiny_step_is_rejected(client, step):
+    body = {"components": [{"intensity": 10}, {"intensity": 30}, {"intensity": 60}], "total_amount": 1, "step": step}
+    response = client.post("/api/mix/complex/sweep", json=body)
+    assert response.status_code == 400
+
+
+def test_duplicate_intensities_match_batch(client):
+    intensities = [20, 20, 70, 90]
+    targets = [30, 45, 60, 80]
+    sweep = client.post("/api/mix/complex/sweep", json={
+        "components": [{"intensity": i} for i in intensities], "total_amount": 10, "targets": targets
+    }).get_json()
+    batch = client.post("/api/mix/complex/batch", json={
+        "intensities": [intensities] * len(targets), "total_amount": [10] * len(targets), "desired_intensity": targets
+    }).get_json()
+
+    for i, result in enumerate(batch["results"]):
+        got = [q for q in (sweep["quantities"][i], sweep["alternative_quantities"][i]) if q is not None]
+        assert len(got) == len(result["quantities"])
+        for quantities, expected in zip(got, result["quantities"]):
+            assert quantities == pytest.approx(expected)
+            assert math.isclose(sum(quantities), 10)
@@ -95,18 +95,13 @@ export default function ComplexMixForm() {
     if (!validateInputs()) return;
 
     try {
-      const res = await fetch(`${API_BASE_URL}/api/mix/complex`, {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({
-          components: components.map((comp, i) => ({
-            name: `Komponenta ${i + 1}`,
-            intensity: parseFloat(comp.intensity)
-          })),
-          total_amount: parseFloat(totalAmount),
-          desired_intensity: parseFloat(desiredIntensity),
-        }),
-      });
+      // GET zahtjev kako bi preglednik i proxy mogli spremiti rezultat u cache;
+      // komponente bez naziva dobivaju nazive "Komponenta 1", "Komponenta 2", ...
+      const params = new URLSearchParams();
+      components.forEach((comp) => params.append("intensity", parseFloat(comp.intensity)));
+      params.append("total_amount", parseFloat(totalAmount));
+      params.append("desired_intensity", parseFloat(desiredIntensity));
+      const res = await fetch(`${API_BASE_URL}/api/mix/complex?${params}`);
 
       const data = await res.json();
 
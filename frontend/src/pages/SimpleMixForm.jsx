@@ -58,16 +58,14 @@ export default function SimpleMixForm() {
     }
 
     try {
-      const res = await fetch(`${API_BASE_URL}/api/mix/simple`, {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({
-          a1: parsedA1,
-          a2: parsedA2,
-          m: parsedM,
-          S: parsedS,
-        }),
+      // GET zahtjev kako bi preglednik i proxy mogli spremiti rezultat u cache
+      const params = new URLSearchParams({
+        a1: parsedA1,
+        a2: parsedA2,
+        m: parsedM,
+        S: parsedS,
       });
+      const res = await fetch(`${API_BASE_URL}/api/mix/simple?${params}`);
 
       const data = await res.json();
 